@@ -0,0 +1,159 @@
+"""
+Analytics API endpoints
+Dashboard aggregates computed from each user's columnar transaction store
+"""
+
+from datetime import date
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from app.models.schemas import AnalyticsSummary, HealthScore
+from app.services.running_analytics import running_analytics
+from app.services.sms_parser import SMSParser
+from app.services.transaction_dedup import transaction_dedupers
+from app.services.transaction_store import transaction_stores
+
+router = APIRouter()
+
+sms_parser = SMSParser()
+
+
+class TransactionBatch(BaseModel):
+    transactions: List[Dict]
+
+
+@router.post("/analytics/{user_id}/sms")
+async def import_sms(user_id: str, request: Request):
+    """
+    Parse an SMS export (raw request body) straight into the user's store
+    Messages already imported for this user (overlapping exports) are skipped
+
+    Args:
+        user_id: Owner of the transactions
+        request: Body is the UTF-8 export, one message per line
+
+    Returns:
+        Number of transactions imported, duplicates skipped and the new total
+    """
+    store = transaction_stores.get(user_id)
+    running = running_analytics.get(user_id)
+    imported = 0
+    batch = []
+    # Fingerprints are committed only once their batch is stored, so a
+    # failed upload can be retried
+    with transaction_dedupers.get(user_id).batch() as pending:
+        async for transaction in sms_parser.aiter_parse(request.stream(), deduper=pending):
+            batch.append(transaction)
+            if len(batch) >= 1000:
+                imported += store.append_many(batch)
+                pending.commit()
+                running.record_many(batch)
+                batch = []
+        imported += store.append_many(batch)
+        pending.commit()
+        running.record_many(batch)
+    return {
+        "imported": imported,
+        "duplicates": pending.duplicates,
+        "total": len(store)
+    }
+
+
+@router.post("/analytics/{user_id}/transactions")
+async def add_transactions(user_id: str, batch: TransactionBatch):
+    """
+    Add already-parsed transactions (SMSParser output shape); transactions
+    already imported for this user are skipped
+
+    Args:
+        user_id: Owner of the transactions
+        batch: Transactions with amount, type, merchant, category and date
+
+    Returns:
+        Number of transactions added, duplicates skipped and the new total
+    """
+    store = transaction_stores.get(user_id)
+    with transaction_dedupers.get(user_id).batch() as pending:
+        try:
+            fresh = [transaction for transaction in batch.transactions if pending.add(transaction)]
+            # append_many converts every row before writing, so it stores all or nothing
+            added = store.append_many(fresh)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid transaction: {str(e)}")
+        pending.commit()
+    running_analytics.get(user_id).record_many(fresh)
+    return {
+        "added": added,
+        "duplicates": pending.duplicates,
+        "total": len(store)
+    }
+
+
+@router.get("/analytics/{user_id}/summary", response_model=AnalyticsSummary)
+async def get_summary(user_id: str, start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Income, expenses, balance and category spending for a date range
+
+    Args:
+        user_id: Owner of the transactions
+        start: First date included (optional)
+        end: Last date included (optional)
+    """
+    return transaction_stores.get(user_id).summary(start, end)
+
+
+@router.get("/analytics/{user_id}/monthly")
+async def get_monthly(user_id: str, start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Month-by-month breakdown for a date range
+
+    Args:
+        user_id: Owner of the transactions
+        start: First date included (optional)
+        end: Last date included (optional)
+    """
+    return {"months": transaction_stores.get(user_id).monthly(start, end)}
+
+
+@router.get("/analytics/{user_id}/live")
+async def get_live_analytics(user_id: str):
+    """
+    Incrementally maintained totals, rolling 30/90-day windows and health score
+    (no history scan)
+
+    Args:
+        user_id: Owner of the transactions
+    """
+    return running_analytics.get(user_id).snapshot()
+
+
+@router.get("/analytics/{user_id}/health-score", response_model=HealthScore)
+async def get_health_score(user_id: str):
+    """
+    Savings-rate health score kept up to date as transactions arrive
+
+    Args:
+        user_id: Owner of the transactions
+    """
+    return running_analytics.get(user_id).health_score()
+
+
+@router.post("/analytics/{user_id}/verify")
+async def verify_running_analytics(user_id: str, repair: bool = False):
+    """
+    Check the running aggregates against a rebuild from the full history
+
+    Args:
+        user_id: Owner of the transactions
+        repair: Replace the running aggregates with the rebuild on mismatch
+
+    Returns:
+        Whether both agree, and the mismatching fields
+    """
+    store = transaction_stores.get(user_id)
+    running = running_analytics.get(user_id)
+    result = running.verify(store)
+    if repair and not result["consistent"]:
+        running.rebuild(store)
+        result["repaired"] = True
+    return result
@@ -2,12 +2,22 @@
 Intent Router API endpoints for agentic navigation
 """
 
+import os
+from typing import List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.services.intent_router import intent_router
+from app.services.single_flight import SingleFlight
+from app.services.cache import normalize_text
 
 router = APIRouter()
 
+# Largest accepted /intent/classify/batch request
+INTENT_BATCH_MAX_SIZE = int(os.getenv("INTENT_BATCH_MAX_SIZE", "5000"))
+
+# In-flight deduplication of identical concurrent intent/help requests
+intent_flights = SingleFlight()
+
 
 class IntentQuery(BaseModel):
     query: str
@@ -23,6 +33,14 @@ class IntentResponse(BaseModel):
     method: str
 
 
+class IntentBatchRequest(BaseModel):
+    queries: List[IntentQuery]
+
+
+class IntentBatchResponse(BaseModel):
+    results: List[IntentResponse]
+
+
 @router.post("/intent/classify", response_model=IntentResponse)
 async def classify_intent(intent_query: IntentQuery):
     """
@@ -35,9 +53,14 @@ async def classify_intent(intent_query: IntentQuery):
         Routing suggestion with confidence and explanation
     """
     try:
-        result = intent_router.classify_intent(
-            query=intent_query.query,
-            language=intent_query.language
+        # Identical concurrent queries share one classification (and LLM call)
+        key = ("classify", normalize_text(intent_query.query), intent_query.language)
+        result = await intent_flights.do(
+            key,
+            lambda: intent_router.classify_intent(
+                query=intent_query.query,
+                language=intent_query.language
+            )
         )
         
         return IntentResponse(**result)
@@ -49,6 +72,36 @@ async def classify_intent(intent_query: IntentQuery):
         )
 
 
+@router.post("/intent/classify/batch", response_model=IntentBatchResponse)
+async def classify_intent_batch(batch: IntentBatchRequest):
+    """
+    Classify many queries in one request (voice assistant, log backfills)
+    
+    Args:
+        batch: List of queries with their language preference
+        
+    Returns:
+        Routing suggestions in the same order as the queries
+    """
+    if len(batch.queries) > INTENT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.queries)} queries (max {INTENT_BATCH_MAX_SIZE})"
+        )
+    
+    try:
+        results = await intent_router.classify_intents(
+            [(item.query, item.language) for item in batch.queries]
+        )
+        return IntentBatchResponse(results=[IntentResponse(**result) for result in results])
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch intent classification failed: {str(e)}"
+        )
+
+
 @router.post("/intent/help")
 async def get_contextual_help(intent_query: IntentQuery):
     """
@@ -64,9 +117,13 @@ async def get_contextual_help(intent_query: IntentQuery):
         if not intent_query.current_route:
             return {"message": "Please provide your current location"}
         
-        help_text = intent_router.get_contextual_help(
-            current_route=intent_query.current_route,
-            query=intent_query.query
+        key = ("help", intent_query.current_route, normalize_text(intent_query.query))
+        help_text = await intent_flights.do(
+            key,
+            lambda: intent_router.get_contextual_help(
+                current_route=intent_query.current_route,
+                query=intent_query.query
+            )
         )
         
         return {"help": help_text}
@@ -89,3 +146,17 @@ async def get_available_features():
     return {
         "features": intent_router.FEATURE_MAP
     }
+
+
+@router.get("/intent/cache-stats")
+async def get_cache_stats():
+    """
+    Cache and request-coalescing counters for monitoring
+    
+    Returns:
+        Hit/miss statistics of the intent and help caches
+    """
+    return {
+        **intent_router.cache_stats(),
+        "coalescing": intent_flights.stats()
+    }
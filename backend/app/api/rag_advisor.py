@@ -4,105 +4,211 @@ Uses Qdrant vector memory + OpenAI for context-aware responses
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
+import asyncio
+import json
 import os
-from typing import Optional, List, Dict
+import threading
+from typing import Optional, List, Dict, Tuple, AsyncIterator
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-# from services.qdrant_memory import FinancialMemoryRAG  # Commented out - using simplified RAG
+from app.services.response_cache import SemanticResponseCache, profile_bands, profile_bucket
+from app.services.affordability import affordability_engine
+from app.services.llm_clients import get_openai_client
+from app.services.llm_gateway import openai_gateway, request_deadline
+from app.services.single_flight import SingleFlight
+from app.services.cache import normalize_text
+from app.services.context_builder import RAG_CONTEXT_TOKEN_BUDGET, count_tokens, pack_context, warm_encoding
 
 router = APIRouter()
 
-# Initialize RAG system and OpenAI
+# RAG system is initialized on first use; OpenAI client comes from llm_clients
 rag_system = None
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+_rag_system_lock = threading.Lock()
+
+# Answers reused for near-identical questions (see SemanticResponseCache)
+response_cache = SemanticResponseCache()
+
+# In-flight deduplication of identical concurrent /rag-chat requests
+rag_chat_flights = SingleFlight()
+
+# Fallback responses
+FALLBACK_RESPONSES = {
+    "en": "💬 I'm having trouble accessing my knowledge base right now. Please try again in a moment!",
+    "hi": "💬 मुझे अभी अपने ज्ञान आधार तक पहुँचने में समस्या हो रही है। कृपया एक क्षण में पुनः प्रयास करें!",
+    "kn": "💬 ನನಗೆ ಈಗ ನನ್ನ ಜ್ಞಾನ ನೆಲೆಯನ್ನು ಪ್ರವೇಶಿಸಲು ಸಮಸ್ಯೆ ಇದೆ. ದಯವಿಟ್ಟು ಸ್ವಲ್ಪ ಸಮಯದ ನಂತರ ಮತ್ತೆ ಪ್ರಯತ್ನಿಸಿ!"
+}
 
 def get_rag_system():
-    """Initialize and seed RAG system once"""
+    """Load (persistent store / snapshot) or seed the RAG system once"""
     global rag_system
     if rag_system is None:
-        from app.services.seed_qdrant import initialize_qdrant_memory
-        rag_system = initialize_qdrant_memory()
+        with _rag_system_lock:
+            if rag_system is None:
+                from app.services.seed_qdrant import load_qdrant_memory
+                rag_system = load_qdrant_memory()
     return rag_system
 
-class RAGAdvisorRequest(BaseModel):
-    message: str
-    language: str = "en"
-    user_profile: Optional[Dict] = None  # {monthly_income, monthly_expenses, credit_score, etc.}
+async def retrieve_knowledge(
+    rag,
+    query_vector: List[float],
+    message: str,
+    language: str,
+    user_profile: Optional[Dict]
+) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Query all knowledge collections concurrently
+    
+    The three searches share one query embedding and run in parallel worker
+    threads, so retrieval latency is bounded by the slowest single search.
+    
+    Returns:
+        (loan_results, advice_results, regulation_results)
+    """
+    loan_results, advice_results, regulation_results = await asyncio.gather(
+        asyncio.to_thread(rag.search_loan_products, message, user_profile, 3, query_vector),
+        asyncio.to_thread(rag.search_financial_advice, message, language, None, 3, query_vector),
+        asyncio.to_thread(rag.search_regulations, message, 2, query_vector)
+    )
+    return loan_results, advice_results, regulation_results
 
-class RAGAdvisorResponse(BaseModel):
-    response: str
-    sources: List[Dict]  # Retrieved knowledge sources
-    recommended_products: Optional[List[Dict]] = None
+def merge_sources(loan_results: List[Dict], advice_results: List[Dict], regulation_results: List[Dict], limit: int = 5) -> List[Dict]:
+    """Combine hits from every collection into one list ranked by score"""
+    tagged = (
+        [{"type": "loan", "data": item} for item in loan_results]
+        + [{"type": "advice", "data": item} for item in advice_results]
+        + [{"type": "regulation", "data": item} for item in regulation_results]
+    )
+    tagged.sort(key=lambda source: source["data"].get("score", 0.0), reverse=True)
+    return tagged[:limit]
 
-@router.post("/rag-chat", response_model=RAGAdvisorResponse)
-async def rag_powered_chat(request: RAGAdvisorRequest):
+# Precomputed loan options quoted in the prompt when the profile has a loanAmount
+RAG_AFFORDABLE_OPTIONS = int(os.getenv("RAG_AFFORDABLE_OPTIONS", "3"))
+
+def affordability_context(user_profile: Optional[Dict]) -> str:
+    """Ranked affordable options for the profile's loanAmount, as prompt lines"""
+    if not user_profile:
+        return ""
+    evaluation = affordability_engine.evaluate_profile(user_profile, limit=RAG_AFFORDABLE_OPTIONS)
+    if evaluation is None:
+        return ""
+    if not evaluation["options"]:
+        return (
+            f"\nPrecomputed affordability for a ₹{evaluation['amount']:,.0f} loan: no catalog option fits "
+            f"a monthly capacity of ₹{evaluation['monthly_capacity']:,.0f} within "
+            f"{evaluation['max_debt_to_income']:.0%} debt-to-income.\n"
+        )
+    lines = [
+        f"- {option['lender']} {option['product_name']}, {option['tenure_months']} months: "
+        f"EMI ₹{option['emi']:,.0f}, total interest ₹{option['total_interest']:,.0f}, "
+        f"debt-to-income {option['debt_to_income']:.0%}"
+        for option in evaluation["options"]
+    ]
+    return (
+        f"\nPrecomputed affordable options for a ₹{evaluation['amount']:,.0f} loan "
+        f"(exact figures, quote them instead of recalculating):\n" + "\n".join(lines) + "\n"
+    )
+
+def cache_scope_for(request: "RAGAdvisorRequest") -> Tuple[Tuple, bool]:
     """
-    Memory-First AI Financial Advisor
-    
-    Flow:
-    1. Retrieve relevant knowledge from Qdrant (loan products, advice, regulations)
-    2. Build context-aware prompt with retrieved information
-    3. Generate personalized response using OpenAI
-    4. Return answer + source citations
+    Scope shared by the response cache and request coalescing: language plus
+    everything the profile puts into the prompt (eligible loan products and
+    banded figures), so requests in one scope get the same prompt
+
+    Returns:
+        (scope, cacheable); prompts quoting exact loan figures also show the
+        exact profile, so they are scoped to those inputs and are not cached
     """
+    profile = request.user_profile
+    scope = (request.language, profile_bucket(profile, affordability_engine.eligible_products(profile)))
+    inputs = affordability_engine.profile_inputs(profile)
+    if inputs is None:
+        return scope, True
+    health_score = profile.get('healthScore', profile.get('health_score'))
+    return scope + (tuple(sorted(inputs.items())), str(health_score)), False
+
+# Section headers for the packed knowledge context, in rendering order
+CONTEXT_SECTIONS = {
+    "advice": "### Relevant Financial Advice:",
+    "loan": "### Available Loan Products:",
+    "regulation": "### Relevant Regulations:"
+}
+
+def to_passages(loan_results: List[Dict], advice_results: List[Dict], regulation_results: List[Dict]) -> List[Dict]:
+    """Render retrieved hits as scored prompt passages"""
+    passages = []
+    for advice in advice_results:
+        passages.append({
+            "section": "advice",
+            "score": advice.get("score", 0.0),
+            "text": f"- Q: {advice['question']}\n  A: {advice['answer']}"
+        })
+    for loan in loan_results:
+        passages.append({
+            "section": "loan",
+            "score": loan.get("score", 0.0),
+            "text": (
+                f"- {loan['lender']} {loan['product_name']}: "
+                f"{loan['interest_rate']}% APR, ₹{loan['min_amount']}-₹{loan['max_amount']}, "
+                f"{loan['tenure_months']}. {loan['features']}"
+            )
+        })
+    for regulation in regulation_results:
+        passages.append({
+            "section": "regulation",
+            "score": regulation.get("score", 0.0),
+            "text": f"- {regulation['title']} ({regulation['authority']}): {regulation['description']}"
+        })
+    return passages
+
+def build_system_prompt(
+    language: str,
+    user_profile: Optional[Dict],
+    loan_results: List[Dict],
+    advice_results: List[Dict],
+    regulation_results: List[Dict],
+    cacheable: bool = True
+) -> Tuple[str, int]:
+    """
+    Assemble the localized system prompt from retrieved knowledge and the user's profile
     
-    try:
-        # Simplified RAG - use hardcoded knowledge base
-        retrieved_knowledge = []
-        loan_results = []
-        
-        # Check for regulatory queries
-        if any(keyword in request.message.lower() for keyword in ['legal', 'regulation', 'rbi', 'law', 'नियम', 'guideline']):
-            # Return RBI regulatory info
-            regulation_context = """RBI Guidelines on Digital Lending:
-- All digital lending platforms must be registered entities
-- Direct benefit transfer (DBT) required - no deductions allowed before loan disbursal
-- Interest rates must be disclosed upfront
-- Lenders must provide loan sanction letter with all-inclusive interest cost
-- No hidden charges allowed
-- Borrowers have right to prepay without penalty after 6 months
-- Consumers entitled to one free credit report per year from credit bureaus"""
-            advice_results = [{"question": "RBI Guidelines", "answer": regulation_context, "category": "regulatory"}]
-        else:
-            # Default financial advice
-            advice_results = [{"question": "General", "answer": "Financial advice based on your profile", "category": "general"}]
-        
-        # Step 2: Build context from retrieved knowledge
-        context_parts = []
-        
-        if advice_results:
-            context_parts.append("### Relevant Financial Advice:")
-            for advice in advice_results:
-                context_parts.append(f"- Q: {advice['question']}")
-                context_parts.append(f"  A: {advice['answer']}")
-        
-        if loan_results:
-            context_parts.append("\n### Available Loan Products:")
-            for loan in loan_results:
-                context_parts.append(
-                    f"- {loan['lender']} {loan['product_name']}: "
-                    f"{loan['interest_rate']}% APR, ₹{loan['min_amount']}-₹{loan['max_amount']}, "
-                    f"{loan['tenure_months']}. {loan['features']}"
-                )
-        
-        context = "\n".join(context_parts)
-        
-        # Step 3: Build user profile context
-        profile_context = ""
-        if request.user_profile:
-            profile_context = f"""
+    The profile block and the retrieved passages together are packed into
+    RAG_CONTEXT_TOKEN_BUDGET tokens (see `pack_context`).
+    
+    Args:
+        cacheable: The answer may be shared within its cache scope, so the
+                   profile figures are shown as ranges (see `cache_scope_for`)
+    
+    Returns:
+        (system prompt, context tokens used)
+    """
+    # User profile context
+    profile_context = ""
+    if user_profile and cacheable:
+        profile_context = "\nUser's Financial Profile (ranges):\n" + "".join(
+            f"- {label}: {band}\n" for label, band in profile_bands(user_profile).items()
+        )
+    elif user_profile:
+        profile_context = f"""
 User's Financial Profile:
-- Monthly Income: ₹{request.user_profile.get('monthlyIncome', 'Not provided')}
-- Monthly Expenses: ₹{request.user_profile.get('monthlyExpenses', 'Not provided')}
-- Monthly Savings: ₹{request.user_profile.get('monthlySavings', 'Not provided')}
-- Financial Health Score: {request.user_profile.get('healthScore', 'Not provided')}/100
-"""
-        
-        # Step 4: Generate response using OpenAI with RAG context
-        system_prompts = {
-            "en": f"""You are ArthaGuide AI, a financial advisor for India's gig workers (Uber/Ola drivers, Swiggy/Zomato delivery partners, freelancers).
+- Monthly Income: ₹{user_profile.get('monthlyIncome', 'Not provided')}
+- Monthly Expenses: ₹{user_profile.get('monthlyExpenses', 'Not provided')}
+- Monthly Savings: ₹{user_profile.get('monthlySavings', 'Not provided')}
+- Financial Health Score: {user_profile.get('healthScore', 'Not provided')}/100
+""" + affordability_context(user_profile)
+    profile_tokens = count_tokens(profile_context)
+    
+    # Context from retrieved knowledge, ranked, deduplicated and fitted to the budget
+    context, context_tokens, _ = pack_context(
+        to_passages(loan_results, advice_results, regulation_results),
+        CONTEXT_SECTIONS,
+        budget=max(RAG_CONTEXT_TOKEN_BUDGET - profile_tokens, 0)
+    )
+    
+    # Localized system prompts with RAG context
+    system_prompts = {
+        "en": f"""You are ArthaGuide AI, a financial advisor for India's gig workers (Uber/Ola drivers, Swiggy/Zomato delivery partners, freelancers).
 
 {profile_context}
 
@@ -119,7 +225,7 @@ Your role:
 - Use retrieved knowledge to give accurate, data-backed answers
 - Always mention specific lenders and products when recommending loans
 """,
-            "hi": f"""आप ArthaGuide AI हैं, भारत के गिग वर्कर्स (Uber/Ola ड्राइवर, Swiggy/Zomato डिलीवरी पार्टनर, फ्रीलांसर) के लिए वित्तीय सलाहकार।
+        "hi": f"""आप ArthaGuide AI हैं, भारत के गिग वर्कर्स (Uber/Ola ड्राइवर, Swiggy/Zomato डिलीवरी पार्टनर, फ्रीलांसर) के लिए वित्तीय सलाहकार।
 
 {profile_context}
 
@@ -132,82 +238,256 @@ Your role:
 - क्रेडिट स्कोर सुधार टिप्स दें
 - बचत और बजट मार्गदर्शन प्रदान करें
 """,
-            "kn": f"""ನೀವು ArthaGuide AI, ಭಾರತದ ಗಿಗ್ ವರ್ಕರ್‌ಗಳಿಗೆ (Uber/Ola ಚಾಲಕರು, Swiggy/Zomato ಡೆಲಿವರಿ ಪಾಲುದಾರರು, ಫ್ರೀಲಾನ್ಸರ್‌ಗಳು) ಹಣಕಾಸು ಸಲಹೆಗಾರರು.
+        "kn": f"""ನೀವು ArthaGuide AI, ಭಾರತದ ಗಿಗ್ ವರ್ಕರ್‌ಗಳಿಗೆ (Uber/Ola ಚಾಲಕರು, Swiggy/Zomato ಡೆಲಿವರಿ ಪಾಲುದಾರರು, ಫ್ರೀಲಾನ್ಸರ್‌ಗಳು) ಹಣಕಾಸು ಸಲಹೆಗಾರರು.
 
 {profile_context}
 
 ಮೆಮೊರಿಯಿಂದ ಪಡೆದ ಜ್ಞಾನ:
 {context}
 """
-        }
+    }
+    
+    return system_prompts.get(language, system_prompts["en"]), profile_tokens + context_tokens
+
+class RAGAdvisorRequest(BaseModel):
+    message: str
+    language: str = "en"
+    user_profile: Optional[Dict] = None  # {monthly_income, monthly_expenses, credit_score, etc.}
+
+class RAGAdvisorResponse(BaseModel):
+    response: str
+    sources: List[Dict]  # Retrieved knowledge sources
+    recommended_products: Optional[List[Dict]] = None
+    cached: bool = False  # Served from the semantic response cache
+    context_tokens: Optional[int] = None  # Prompt tokens spent on profile + retrieved knowledge
+
+async def answer_rag_chat(request: RAGAdvisorRequest) -> RAGAdvisorResponse:
+    """
+    Memory-First AI Financial Advisor pipeline behind /rag-chat
+    
+    Flow:
+    0. Return a cached answer for a near-identical question, if any
+    1. Retrieve relevant knowledge from Qdrant (loan products, advice, regulations)
+    2. Build context-aware prompt with retrieved information
+    3. Generate personalized response using OpenAI
+    4. Return answer + source citations
+    """
+    
+    deadline = request_deadline()
+    try:
+        rag = await asyncio.to_thread(get_rag_system)
+        query_vector = await asyncio.to_thread(rag.embed_query, request.message)
         
-        system_prompt = system_prompts.get(request.language, system_prompts["en"])
+        # Step 0: Semantic cache lookup (same language and profile scope)
+        cache_scope, cacheable = cache_scope_for(request)
+        cached_response = response_cache.lookup(query_vector, cache_scope, rag.kb_version) if cacheable else None
+        if cached_response is not None:
+            return cached_response.model_copy(update={"cached": True})
+        
+        # Step 1: Retrieve relevant knowledge from every collection in parallel
+        loan_results, advice_results, regulation_results = await retrieve_knowledge(
+            rag, query_vector, request.message, request.language, request.user_profile
+        )
         
-        # Call OpenAI with RAG context
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": request.message}
-            ],
-            max_tokens=300,
-            temperature=0.7
+        # Step 2: Build context-aware prompt from retrieved knowledge and the user's profile
+        await warm_encoding()
+        system_prompt, context_tokens = build_system_prompt(
+            request.language, request.user_profile, loan_results, advice_results, regulation_results, cacheable
+        )
+        
+        # Step 3: Call OpenAI with RAG context (bounded by the gateway's limits and deadline)
+        response = await openai_gateway.call(
+            lambda: get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": request.message}
+                ],
+                max_tokens=300,
+                temperature=0.7
+            ),
+            deadline=deadline
         )
         
         ai_response = response.choices[0].message.content
         
-        # Step 5: Return response with sources
-        return RAGAdvisorResponse(
+        # Step 4: Return response with sources
+        rag_response = RAGAdvisorResponse(
             response=ai_response,
-            sources=[
-                {
-                    "type": "advice" if "question" in item else "loan" if "lender" in item else "regulation",
-                    "data": item
-                }
-                for item in (advice_results + loan_results)[:5]
-            ],
-            recommended_products=loan_results if loan_results else None
+            sources=merge_sources(loan_results, advice_results, regulation_results),
+            recommended_products=loan_results if loan_results else None,
+            context_tokens=context_tokens
         )
+        if cacheable:
+            response_cache.store(query_vector, cache_scope, rag.kb_version, rag_response)
+        return rag_response
         
     except Exception as e:
         print(f"Error in RAG advisor: {e}")
         
-        # Fallback responses
-        fallback_responses = {
-            "en": "💬 I'm having trouble accessing my knowledge base right now. Please try again in a moment!",
-            "hi": "💬 मुझे अभी अपने ज्ञान आधार तक पहुँचने में समस्या हो रही है। कृपया एक क्षण में पुनः प्रयास करें!",
-            "kn": "💬 ನನಗೆ ಈಗ ನನ್ನ ಜ್ಞಾನ ನೆಲೆಯನ್ನು ಪ್ರವೇಶಿಸಲು ಸಮಸ್ಯೆ ಇದೆ. ದಯವಿಟ್ಟು ಸ್ವಲ್ಪ ಸಮಯದ ನಂತರ ಮತ್ತೆ ಪ್ರಯತ್ನಿಸಿ!"
-        }
-        
         return RAGAdvisorResponse(
-            response=fallback_responses.get(request.language, fallback_responses["en"]),
+            response=FALLBACK_RESPONSES.get(request.language, FALLBACK_RESPONSES["en"]),
             sources=[]
         )
 
+@router.post("/rag-chat", response_model=RAGAdvisorResponse)
+async def rag_powered_chat(request: RAGAdvisorRequest):
+    """
+    Memory-First AI Financial Advisor
+    
+    Identical concurrent questions (same normalized message and profile
+    scope, see `cache_scope_for`) share one pipeline run and one LLM call.
+    """
+    scope, _ = cache_scope_for(request)
+    key = (normalize_text(request.message),) + scope
+    return await rag_chat_flights.do(key, lambda: answer_rag_chat(request))
+
+def sse_event(event: str, data: Dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_rag_chat(request: RAGAdvisorRequest) -> AsyncIterator[str]:
+    """
+    Event stream for `rag_powered_chat_stream`
+    
+    Events:
+    - sources: retrieved sources, recommended products and context token count
+      (sent before generation starts)
+    - token: a chunk of the answer text
+    - done: end of stream ({"cached": bool, "fallback": bool})
+    """
+    streamed_any = False
+    deadline = request_deadline()
+    try:
+        rag = await asyncio.to_thread(get_rag_system)
+        query_vector = await asyncio.to_thread(rag.embed_query, request.message)
+        
+        cache_scope, cacheable = cache_scope_for(request)
+        cached_response = response_cache.lookup(query_vector, cache_scope, rag.kb_version) if cacheable else None
+        if cached_response is not None:
+            yield sse_event("sources", {
+                "sources": cached_response.sources,
+                "recommended_products": cached_response.recommended_products,
+                "context_tokens": cached_response.context_tokens
+            })
+            yield sse_event("token", {"text": cached_response.response})
+            yield sse_event("done", {"cached": True, "fallback": False})
+            return
+        
+        loan_results, advice_results, regulation_results = await retrieve_knowledge(
+            rag, query_vector, request.message, request.language, request.user_profile
+        )
+        sources = merge_sources(loan_results, advice_results, regulation_results)
+        await warm_encoding()
+        system_prompt, context_tokens = build_system_prompt(
+            request.language, request.user_profile, loan_results, advice_results, regulation_results, cacheable
+        )
+        yield sse_event("sources", {
+            "sources": sources,
+            "recommended_products": loan_results if loan_results else None,
+            "context_tokens": context_tokens
+        })
+        
+        # The gateway holds its concurrency slot and applies the deadline
+        # until the last chunk has arrived
+        stream = openai_gateway.stream(
+            lambda: get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": request.message}
+                ],
+                max_tokens=300,
+                temperature=0.7,
+                stream=True
+            ),
+            deadline=deadline
+        )
+        
+        parts = []
+        async for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                parts.append(text)
+                streamed_any = True
+                yield sse_event("token", {"text": text})
+        
+        if cacheable:
+            response_cache.store(query_vector, cache_scope, rag.kb_version, RAGAdvisorResponse(
+                response="".join(parts),
+                sources=sources,
+                recommended_products=loan_results if loan_results else None,
+                context_tokens=context_tokens
+            ))
+        yield sse_event("done", {"cached": False, "fallback": False})
+        
+    except Exception as e:
+        print(f"Error in RAG advisor stream: {e}")
+        
+        # Same fallback as the non-streaming endpoint, unless part of an answer already went out
+        if not streamed_any:
+            yield sse_event("token", {"text": FALLBACK_RESPONSES.get(request.language, FALLBACK_RESPONSES["en"])})
+        yield sse_event("done", {"cached": False, "fallback": True})
+
+@router.post("/rag-chat/stream")
+async def rag_powered_chat_stream(request: RAGAdvisorRequest):
+    """
+    Streaming variant of /rag-chat (server-sent events)
+    Sources are sent as soon as retrieval finishes, then the answer token by token
+    """
+    return StreamingResponse(
+        stream_rag_chat(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/health")
 async def rag_health():
     """Health check for RAG system"""
     return {
         "status": "healthy",
         "service": "RAG Financial Advisor",
-        "mode": "simplified_rag",
-        "llm": "OpenAI GPT-3.5-turbo"
+        "mode": "vector_rag",
+        "llm": "OpenAI GPT-3.5-turbo",
+        "response_cache": response_cache.stats(),
+        "llm_gateway": openai_gateway.stats(),
+        "coalescing": rag_chat_flights.stats()
     }
 
 @router.post("/search-loans")
 async def search_loans(query: str, user_profile: Optional[Dict] = None):
     """Direct loan product search endpoint"""
     try:
-        results = rag_system.search_loan_products(query, user_profile, top_k=5)
+        rag = await asyncio.to_thread(get_rag_system)
+        results = await asyncio.to_thread(rag.search_loan_products, query, user_profile, 5)
         return {"results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class LoanOptionsRequest(BaseModel):
+    user_profile: Dict  # {monthlyIncome, monthlyExpenses, monthlySavings, existingEmi, creditScore, age, loanAmount}
+    amount: Optional[float] = None  # Defaults to the profile's loanAmount
+    limit: int = 10
+
+@router.post("/loan-options")
+async def loan_options(request: LoanOptionsRequest):
+    """
+    Affordable loan options for a profile, ranked by total interest
+
+    EMI, total interest and debt-to-income are computed for every product x
+    tenure in the catalog without calling the LLM
+    """
+    evaluation = affordability_engine.evaluate_profile(request.user_profile, request.amount, max(request.limit, 0))
+    if evaluation is None:
+        raise HTTPException(status_code=400, detail="A positive loan amount and monthlyIncome are required")
+    return evaluation
+
 @router.post("/search-advice")
 async def search_advice(query: str, language: str = "en", category: Optional[str] = None):
     """Direct financial advice search endpoint"""
     try:
-        results = rag_system.search_financial_advice(query, language, category, top_k=5)
+        rag = await asyncio.to_thread(get_rag_system)
+        results = await asyncio.to_thread(rag.search_financial_advice, query, language, category, 5)
         return {"results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,110 @@
+"""
+SMS Import API endpoints
+Parses bank SMS exports as the upload arrives, without holding the whole export in memory
+"""
+
+import json
+import os
+import tempfile
+from typing import Iterator
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.services.sms_bulk import bulk_parser
+from app.services.sms_parser import SMSParser
+
+router = APIRouter()
+
+# Parsed results above this size are spooled to a temporary file
+SMS_SPOOL_MEMORY_BYTES = int(os.getenv("SMS_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+SMS_RESPONSE_CHUNK_BYTES = 64 * 1024
+
+sms_parser = SMSParser()
+
+
+def read_spool(spool) -> Iterator[bytes]:
+    """Stream a spooled NDJSON body back and close it afterwards"""
+    try:
+        while True:
+            chunk = spool.read(SMS_RESPONSE_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        spool.close()
+
+
+@router.post("/sms/parse/stream")
+async def parse_sms_stream(request: Request):
+    """
+    Parse an SMS export sent as a raw (chunked) request body
+
+    Each line is parsed as soon as it arrives. Transactions are written to a
+    spool that stays in memory up to SMS_SPOOL_MEMORY_BYTES and then moves to
+    disk, so peak memory does not depend on the export size. The whole body is
+    read before the response starts, because some servers cannot keep reading
+    a request once a streaming response has begun
+
+    Args:
+        request: Body is the UTF-8 export, one message per line
+
+    Returns:
+        NDJSON stream with one transaction per line
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SMS_SPOOL_MEMORY_BYTES, mode="w+b")
+    count = 0
+    try:
+        async for transaction in sms_parser.aiter_parse(request.stream()):
+            spool.write(json.dumps(transaction, ensure_ascii=False).encode("utf-8") + b"\n")
+            count += 1
+    except Exception as e:
+        spool.close()
+        raise HTTPException(status_code=400, detail=f"SMS parsing failed: {str(e)}")
+
+    spool.seek(0)
+    return StreamingResponse(
+        read_spool(spool),
+        media_type="application/x-ndjson",
+        headers={"X-Transaction-Count": str(count)}
+    )
+
+
+@router.post("/sms/bulk", status_code=202)
+async def start_bulk_parse(request: Request):
+    """
+    Start a background bulk parse of a large export (onboarding backfills)
+
+    Args:
+        request: Body is the UTF-8 export, one message per line
+
+    Returns:
+        Job id and initial status; poll /sms/bulk/{job_id} for progress
+    """
+    body = await request.body()
+    if not body.strip():
+        raise HTTPException(status_code=400, detail="Empty SMS export")
+
+    job = bulk_parser.submit(body.decode("utf-8", errors="replace"))
+    return job.to_dict()
+
+
+@router.get("/sms/bulk/{job_id}")
+async def get_bulk_parse(job_id: str, offset: int = 0, limit: int = 0):
+    """
+    Progress of a bulk parse job, with a page of its transactions once completed
+
+    Args:
+        job_id: Id returned by POST /sms/bulk
+        offset: First transaction to return
+        limit: Number of transactions to return (0 returns none)
+
+    Returns:
+        Job status, progress (0-1) and the requested transactions
+    """
+    job = bulk_parser.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+
+    result = job.to_dict()
+    if job.status == "completed" and limit > 0:
+        result["transactions"] = job.transactions[offset:offset + limit]
+    return result
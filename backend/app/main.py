@@ -1,14 +1,26 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
 
 # Import routers at the top
-from app.api import rag_advisor, intent_router
+from app.api import rag_advisor, intent_router, sms, analytics
+from app.services.context_builder import warm_encoding
+from app.services.sms_bulk import bulk_parser
 
 load_dotenv()
 
-app = FastAPI(title="ArthaGuide API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fetch the tokenizer in the background so the first chat request doesn't wait on it
+    warmup = asyncio.create_task(warm_encoding())
+    yield
+    warmup.cancel()
+    bulk_parser.shutdown()
+
+app = FastAPI(title="ArthaGuide API", version="1.0.0", lifespan=lifespan)
 
 # CORS - Allow all Vercel deployments
 origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
@@ -35,3 +47,5 @@ def health_check():
 # Register routers
 app.include_router(rag_advisor.router, prefix="/api", tags=["rag-advisor"])
 app.include_router(intent_router.router, prefix="/api", tags=["intent-router"])
+app.include_router(sms.router, prefix="/api", tags=["sms"])
+app.include_router(analytics.router, prefix="/api", tags=["analytics"])
@@ -0,0 +1,222 @@
+"""
+Affordability Engine for loan recommendations
+EMI, total interest and debt-to-income for every loan product x tenure in the
+catalog are computed in one vectorized NumPy pass, so the advisor ranks and
+quotes exact numbers instead of asking the LLM to do the arithmetic
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.loan_eligibility import loan_eligibility_fields, profile_number
+from app.services.seed_qdrant import LOAN_PRODUCTS
+
+# Tenures (months) offered to the user, masked by each product's own range
+STANDARD_TENURES = (3, 6, 9, 12, 18, 24, 36, 48, 60)
+# Total EMIs (existing + new) as a share of monthly income
+MAX_DEBT_TO_INCOME = float(os.getenv("MAX_DEBT_TO_INCOME", "0.4"))
+
+TENURE_RANGE_REGEX = re.compile(r'(\d+)\s*-\s*(\d+)\s*months?', re.IGNORECASE)
+
+
+class AffordabilityEngine:
+    """
+    Precomputed loan catalog as arrays (products P x tenures T)
+    - EMI factors r(1+r)^n / ((1+r)^n - 1) for every product and tenure
+    - Tenure and amount ranges, plus the eligibility limits parsed from the
+      product's free-text `eligibility` (income, credit score, age)
+    Evaluating a profile is a handful of (P, T) array operations
+    """
+
+    def __init__(self, products: List[Dict] = LOAN_PRODUCTS, tenures=STANDARD_TENURES):
+        self.products = list(products)
+        self.tenures = np.asarray(tenures, dtype=np.float64)
+
+        def column(key: str) -> np.ndarray:
+            return np.array([limits.get(key, np.nan) for limits in self._limits], dtype=np.float64)
+
+        self._limits = []
+        for product in self.products:
+            limits = dict(product)
+            limits.update(loan_eligibility_fields(product))
+            tenure_match = TENURE_RANGE_REGEX.search(str(product.get("tenure_months", "")))
+            if tenure_match:
+                limits["min_tenure"] = int(tenure_match.group(1))
+                limits["max_tenure"] = int(tenure_match.group(2))
+            self._limits.append(limits)
+
+        self.rates = column("interest_rate")
+        self.min_amount = column("min_amount")
+        self.max_amount = column("max_amount")
+        self.min_income = column("min_income")
+        self.min_credit_score = column("min_credit_score")
+        self.min_age = column("min_age")
+        self.max_age = column("max_age")
+
+        # (P, T) tenure mask; products without a parseable range allow every tenure
+        min_tenure = np.nan_to_num(column("min_tenure"), nan=0)[:, None]
+        max_tenure = np.nan_to_num(column("max_tenure"), nan=np.inf)[:, None]
+        self.tenure_allowed = (self.tenures >= min_tenure) & (self.tenures <= max_tenure)
+
+        # (P, T) EMI per rupee borrowed
+        monthly_rate = (self.rates / 1200)[:, None]
+        growth = (1 + monthly_rate) ** self.tenures
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.emi_factors = np.where(
+                monthly_rate > 0,
+                monthly_rate * growth / (growth - 1),
+                1 / self.tenures
+            )
+
+    def _eligible(
+        self,
+        amount: Optional[float],
+        income: Optional[float],
+        credit_score: Optional[float],
+        age: Optional[float]
+    ) -> np.ndarray:
+        """
+        (P,) products whose amount range and eligibility limits the user meets
+        Limits a product doesn't state, and profile values that are unknown, pass
+        (the same rules as the vector search's eligibility filter)
+        """
+        eligible = np.ones(len(self.products), dtype=bool)
+        if amount is not None:
+            eligible &= ~(self.min_amount > amount) & ~(self.max_amount < amount)
+        if income is not None:
+            eligible &= ~(self.min_income > income)
+        if credit_score is not None:
+            eligible &= ~(self.min_credit_score > credit_score)
+        if age is not None:
+            eligible &= ~(self.min_age > age) & ~(self.max_age < age)
+        return eligible
+
+    def eligible_products(self, user_profile: Optional[Dict]) -> List[str]:
+        """
+        "lender / product" names the profile qualifies for (monthlyIncome,
+        creditScore, age, loanAmount), i.e. the loan products retrieval can return
+        """
+        eligible = self._eligible(
+            profile_number(user_profile, "loanAmount", "loan_amount"),
+            profile_number(user_profile, "monthlyIncome", "monthly_income"),
+            profile_number(user_profile, "creditScore", "credit_score"),
+            profile_number(user_profile, "age")
+        )
+        return [
+            f"{product['lender']} / {product['product_name']}"
+            for product, allowed in zip(self.products, eligible)
+            if allowed
+        ]
+
+    def evaluate(
+        self,
+        amount: float,
+        monthly_income: float,
+        monthly_expenses: float = 0.0,
+        monthly_savings: Optional[float] = None,
+        existing_emi: float = 0.0,
+        credit_score: Optional[float] = None,
+        age: Optional[float] = None,
+        max_dti: float = MAX_DEBT_TO_INCOME,
+        limit: Optional[int] = None
+    ) -> Dict:
+        """
+        Every product x tenure for one requested amount, affordable ones ranked
+
+        An option is affordable when the product is eligible, the tenure is in
+        the product's range, the EMI fits in monthly savings and the total
+        debt-to-income (existing EMIs + this EMI) stays within `max_dti`
+
+        Args:
+            amount: Requested loan amount (₹)
+            monthly_income: Monthly income (₹)
+            monthly_expenses: Monthly expenses (₹), used when savings are not given
+            monthly_savings: Monthly surplus available for an EMI (₹)
+            existing_emi: EMIs already being paid each month (₹)
+            credit_score: Credit score, if known
+            age: Age, if known
+            max_dti: Maximum debt-to-income ratio
+            limit: Return at most this many options
+
+        Returns:
+            Dict with the monthly capacity, counts and options ranked by total
+            interest (then EMI)
+        """
+        if monthly_savings is None:
+            monthly_savings = monthly_income - monthly_expenses
+
+        emi = amount * self.emi_factors
+        total_payment = emi * self.tenures
+        total_interest = total_payment - amount
+        dti = (existing_emi + emi) / monthly_income if monthly_income > 0 else np.full_like(emi, np.inf)
+
+        eligible = self.tenure_allowed & self._eligible(amount, monthly_income, credit_score, age)[:, None]
+        affordable = eligible & (emi <= monthly_savings) & (dti <= max_dti)
+
+        rows, cols = np.nonzero(affordable)
+        order = np.lexsort((emi[rows, cols], total_interest[rows, cols]))
+        if limit is not None:
+            order = order[:limit]
+
+        options = []
+        for index in order:
+            row, col = rows[index], cols[index]
+            product = self.products[row]
+            options.append({
+                "lender": product["lender"],
+                "product_name": product["product_name"],
+                "interest_rate": product["interest_rate"],
+                "tenure_months": int(self.tenures[col]),
+                "emi": round(float(emi[row, col]), 2),
+                "total_interest": round(float(total_interest[row, col]), 2),
+                "total_payment": round(float(total_payment[row, col]), 2),
+                "debt_to_income": round(float(dti[row, col]), 4),
+                "savings_after_emi": round(float(monthly_savings - emi[row, col]), 2)
+            })
+
+        return {
+            "amount": amount,
+            "monthly_capacity": round(float(monthly_savings), 2),
+            "max_debt_to_income": max_dti,
+            "evaluated": int(emi.size),
+            "eligible": int(eligible.sum()),
+            "affordable": int(affordable.sum()),
+            "options": options
+        }
+
+    @staticmethod
+    def profile_inputs(user_profile: Optional[Dict], amount: Optional[float] = None) -> Optional[Dict]:
+        """
+        `evaluate` arguments from a chat profile (monthlyIncome, monthlyExpenses,
+        monthlySavings, existingEmi, creditScore, age, loanAmount)
+
+        Returns:
+            Keyword arguments, or None when the amount or income is missing
+        """
+        if amount is None:
+            amount = profile_number(user_profile, "loanAmount", "loan_amount")
+        income = profile_number(user_profile, "monthlyIncome", "monthly_income")
+        if not amount or amount <= 0 or not income or income <= 0:
+            return None
+        return {
+            "amount": amount,
+            "monthly_income": income,
+            "monthly_expenses": profile_number(user_profile, "monthlyExpenses", "monthly_expenses") or 0.0,
+            "monthly_savings": profile_number(user_profile, "monthlySavings", "monthly_savings"),
+            "existing_emi": profile_number(user_profile, "existingEmi", "existing_emi") or 0.0,
+            "credit_score": profile_number(user_profile, "creditScore", "credit_score"),
+            "age": profile_number(user_profile, "age")
+        }
+
+    def evaluate_profile(self, user_profile: Optional[Dict], amount: Optional[float] = None, limit: Optional[int] = None) -> Optional[Dict]:
+        """`evaluate` for a chat profile; None when the amount or income is missing"""
+        inputs = self.profile_inputs(user_profile, amount)
+        if inputs is None:
+            return None
+        return self.evaluate(limit=limit, **inputs)
+
+# Singleton instance
+affordability_engine = AffordabilityEngine()
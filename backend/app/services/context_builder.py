@@ -0,0 +1,157 @@
+"""
+Prompt Context Packing for the RAG advisor
+Fits retrieved passages into a token budget: ranks by retrieval score,
+drops near-duplicate passages, truncates the last one that partly fits and
+reports how many tokens were used
+"""
+
+import asyncio
+import math
+import os
+from threading import Lock
+from typing import Callable, Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokens available for retrieved knowledge plus the profile block
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1000"))
+
+# Passages sharing at least this fraction of word trigrams with an
+# already-selected passage are treated as duplicates
+DUPLICATE_OVERLAP = 0.8
+
+# Don't bother truncating a passage into less room than this
+MIN_TRUNCATED_TOKENS = 24
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = Lock()
+
+
+def load_encoding():
+    """
+    tiktoken encoding for gpt-3.5-turbo, or None if it is unavailable offline
+    The first call may download the BPE file, so async code should use
+    `warm_encoding` instead of calling this on the event loop
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                if tiktoken is not None:
+                    try:
+                        _encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+                    except Exception as e:
+                        print(f"tiktoken unavailable, estimating token counts: {e}")
+                _encoding_loaded = True
+    return _encoding
+
+
+async def warm_encoding():
+    """Load the encoding in a worker thread (no-op once loaded)"""
+    if not _encoding_loaded:
+        await asyncio.to_thread(load_encoding)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count for the chat model; falls back to an estimate of ~4 ASCII
+    characters per token and one token per non-ASCII character (Devanagari
+    and Kannada split into roughly one token per character or more)
+    """
+    encoding = load_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` to at most `max_tokens` tokens, ending with an ellipsis"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = load_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max(max_tokens - 1, 0)]) + "…"
+    # Binary search on character length against the estimate
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) + 1 <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + "…"
+
+
+def _trigrams(text: str) -> set:
+    words = text.lower().split()
+    if len(words) < 3:
+        return {tuple(words)}
+    return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def _is_duplicate(shingles: set, selected: List[set]) -> bool:
+    for other in selected:
+        smaller = min(len(shingles), len(other)) or 1
+        if len(shingles & other) / smaller >= DUPLICATE_OVERLAP:
+            return True
+    return False
+
+
+def pack_context(
+    passages: List[Dict],
+    section_headers: Dict[str, str],
+    budget: int = RAG_CONTEXT_TOKEN_BUDGET,
+    tokens: Callable[[str], int] = count_tokens
+) -> Tuple[str, int, List[Dict]]:
+    """
+    Select and render passages within a token budget
+    
+    Args:
+        passages: [{"section": str, "text": str, "score": float}, ...]
+        section_headers: Section key -> header line, in rendering order
+        budget: Maximum tokens for the rendered context
+        
+    Returns:
+        (context text, tokens used, selected passages)
+    """
+    used = 0
+    selected: List[Dict] = []
+    selected_shingles: List[set] = []
+    open_sections = set()
+    
+    for passage in sorted(passages, key=lambda p: p.get("score", 0.0), reverse=True):
+        shingles = _trigrams(passage["text"])
+        if _is_duplicate(shingles, selected_shingles):
+            continue
+        
+        header_cost = 0 if passage["section"] in open_sections else tokens(section_headers[passage["section"]]) + 1
+        cost = header_cost + tokens(passage["text"]) + 1
+        
+        if used + cost > budget:
+            room = budget - used - header_cost - 1
+            if room < MIN_TRUNCATED_TOKENS:
+                continue
+            passage = {**passage, "text": truncate_to_tokens(passage["text"], room)}
+            cost = header_cost + tokens(passage["text"]) + 1
+        
+        used += cost
+        open_sections.add(passage["section"])
+        selected.append(passage)
+        selected_shingles.append(shingles)
+    
+    # Render by section (in header order), best passages first within each
+    lines = []
+    for section, header in section_headers.items():
+        section_passages = [p["text"] for p in selected if p["section"] == section]
+        if section_passages:
+            if lines:
+                lines.append("")
+            lines.append(header)
+            lines.extend(section_passages)
+    
+    return "\n".join(lines), used, selected
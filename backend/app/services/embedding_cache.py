@@ -0,0 +1,167 @@
+"""
+Persistent Embedding Cache for the SentenceTransformer encoder
+Vectors are keyed by (model name, SHA-256 of the text) so unchanged documents
+are never re-embedded across process restarts
+"""
+
+import hashlib
+import os
+import sqlite3
+from threading import Lock
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from app.services.cache import LRUCache
+
+# On-disk tier location ("" disables it) and in-process tier size
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+
+
+# One loaded model per name, shared by the RAG store and the intent classifier
+_encoders: Dict[str, "CachedEncoder"] = {}
+_encoders_lock = Lock()
+
+
+def content_hash(text: str) -> bytes:
+    """Stable digest of the text used as the cache key"""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier vector cache
+    - In-process LRU of recently used vectors
+    - SQLite blob table of float32 vectors shared by every worker on the host
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        path: Optional[str] = EMBEDDING_CACHE_PATH,
+        maxsize: int = EMBEDDING_CACHE_SIZE
+    ):
+        self.model_name = model_name
+        self.memory = LRUCache(maxsize)
+        self._db = None
+        self._lock = Lock()
+        
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    content_hash BLOB NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, content_hash)
+                )"""
+            )
+            self._db.commit()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Look up vectors for the given content hashes; missing keys are omitted"""
+        found = {}
+        missing = []
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                found[key] = vector
+        
+        if missing and self._db is not None:
+            with self._lock:
+                # Stay well below SQLite's bound-parameter limit
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._db.execute(
+                        f"SELECT content_hash, vector FROM embeddings "
+                        f"WHERE model = ? AND content_hash IN ({placeholders})",
+                        [self.model_name, *chunk]
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[bytes(key)] = vector
+                        self.memory.set(bytes(key), vector)
+        
+        return found
+    
+    def put_many(self, items: Dict[bytes, np.ndarray]):
+        """Store vectors in both tiers"""
+        for key, vector in items.items():
+            self.memory.set(key, vector)
+        
+        if items and self._db is not None:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, content_hash, vector) VALUES (?, ?, ?)",
+                    [
+                        (self.model_name, key, np.asarray(vector, dtype=np.float32).tobytes())
+                        for key, vector in items.items()
+                    ]
+                )
+                self._db.commit()
+
+
+class CachedEncoder:
+    """
+    Drop-in wrapper around `SentenceTransformer.encode` that only sends
+    cache misses through the model
+    """
+    
+    def __init__(self, model, model_name: str, cache: Optional[EmbeddingCache] = None):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache(model_name)
+    
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        """
+        Embed one text (returns a 1-D vector) or a list of texts (returns a
+        2-D float32 array in input order)
+        """
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        
+        keys = [content_hash(text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        
+        # Encode each distinct missing text once
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in pending:
+                pending[key] = text
+        
+        if pending:
+            encoded = self.model.encode(list(pending.values()), batch_size=batch_size)
+            fresh = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(pending.keys(), encoded)
+            }
+            self.cache.put_many(fresh)
+            vectors.update(fresh)
+        
+        result = np.stack([vectors[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+        return result[0] if single else result
+
+
+def get_encoder(model_name: str) -> CachedEncoder:
+    """
+    Shared cached encoder for `model_name`, loading the SentenceTransformer
+    model on first use (raises ImportError if sentence-transformers is missing)
+    """
+    encoder = _encoders.get(model_name)
+    if encoder is None:
+        with _encoders_lock:
+            encoder = _encoders.get(model_name)
+            if encoder is None:
+                from sentence_transformers import SentenceTransformer
+                encoder = CachedEncoder(SentenceTransformer(model_name), model_name)
+                _encoders[model_name] = encoder
+    return encoder
@@ -0,0 +1,132 @@
+"""
+Local Embedding-based Intent Classifier
+Routes queries by kNN similarity to each feature's examples and description,
+so most queries that miss every keyword never reach the LLM
+"""
+
+import os
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.cache import normalize_text
+from app.services.embedding_cache import get_encoder
+
+# Minimum similarity score for a local decision (below it the LLM is consulted)
+INTENT_LOCAL_THRESHOLD = float(os.getenv("INTENT_LOCAL_THRESHOLD", "0.5"))
+# Required lead of the best feature over the runner-up
+INTENT_LOCAL_MARGIN = float(os.getenv("INTENT_LOCAL_MARGIN", "0.03"))
+# Nearest exemplars averaged per feature
+INTENT_KNN_K = int(os.getenv("INTENT_KNN_K", "2"))
+INTENT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+class EmbeddingIntentClassifier:
+    """
+    Per-feature kNN over normalized MiniLM embeddings
+
+    A feature's score is the mean cosine similarity of its `k` closest
+    exemplars to the query; the exemplar matrix is built lazily on first use
+    """
+
+    def __init__(
+        self,
+        feature_map: Dict[str, Dict],
+        model_name: str = INTENT_EMBEDDING_MODEL,
+        threshold: float = INTENT_LOCAL_THRESHOLD,
+        margin: float = INTENT_LOCAL_MARGIN,
+        k: int = INTENT_KNN_K
+    ):
+        self.feature_map = feature_map
+        self.model_name = model_name
+        self.threshold = threshold
+        self.margin = margin
+        self.k = k
+        self.available = True
+        self._encoder = None
+        self._features: List[str] = []
+        self._columns: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = Lock()
+
+    def _exemplars(self) -> Tuple[List[str], List[int]]:
+        """Exemplar texts and the index of the feature each belongs to"""
+        texts, owners = [], []
+        for index, info in enumerate(self.feature_map.values()):
+            for text in [*info.get("examples", []), info.get("description", "")]:
+                if text:
+                    texts.append(text)
+                    owners.append(index)
+        return texts, owners
+
+    def _ensure_index(self) -> bool:
+        """Embed all exemplars once; False if the encoder can't be loaded"""
+        if self._matrix is not None or not self.available:
+            return self.available
+
+        with self._lock:
+            if self._matrix is None and self.available:
+                try:
+                    encoder = get_encoder(self.model_name)
+                    texts, owners = self._exemplars()
+                    matrix = encoder.encode(texts)
+                except Exception as e:
+                    print(f"⚠️  Local intent classifier unavailable: {e}")
+                    self.available = False
+                    return False
+
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                owners = np.asarray(owners)
+                self._features = list(self.feature_map)
+                self._columns = [np.flatnonzero(owners == i) for i in range(len(self._features))]
+                self._encoder = encoder
+                self._matrix = matrix
+                print(f"✅ Local intent classifier ready ({len(texts)} exemplars)")
+        return self.available
+
+    def scores_many(self, queries: List[str]) -> Optional[np.ndarray]:
+        """
+        Feature scores for a batch of queries, shape (len(queries), features),
+        in `feature_map` order; None when the classifier is unavailable
+        """
+        if not self._ensure_index():
+            return None
+
+        vectors = np.asarray(
+            self._encoder.model.encode([normalize_text(q) for q in queries]),
+            dtype=np.float32
+        )
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarities = vectors @ self._matrix.T
+
+        scores = np.empty((len(queries), len(self._features)), dtype=np.float32)
+        for index, columns in enumerate(self._columns):
+            k = min(self.k, len(columns))
+            nearest = np.partition(similarities[:, columns], -k, axis=1)[:, -k:]
+            scores[:, index] = nearest.mean(axis=1)
+        return scores
+
+    def classify_many(self, queries: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """
+        (feature_id, confidence) per query when the best feature clears the
+        threshold and margin, otherwise None
+        """
+        scores = self.scores_many(queries)
+        if scores is None:
+            return [None] * len(queries)
+
+        results = []
+        for row in scores:
+            order = np.argsort(row)[::-1]
+            best = float(row[order[0]])
+            runner_up = float(row[order[1]]) if len(order) > 1 else -1.0
+            if best >= self.threshold and best - runner_up >= self.margin:
+                results.append((self._features[order[0]], round(min(best, 1.0), 3)))
+            else:
+                results.append(None)
+        return results
+
+    def classify(self, query: str) -> Optional[Tuple[str, float]]:
+        """Single-query variant of `classify_many`"""
+        return self.classify_many([query])[0]
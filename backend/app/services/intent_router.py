@@ -3,13 +3,28 @@ Intent Recognition Service for Agentic Navigation
 Analyzes user queries and routes to appropriate features
 """
 
+import asyncio
+import json
+import math
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import google.generativeai as genai
+from app.services.cache import LRUCache, normalize_text
+from app.services.intent_classifier import EmbeddingIntentClassifier
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.llm_gateway import gemini_gateway, request_deadline
 
 # Configure Gemini API
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
+# Cached LLM classifications / help answers (navigation questions repeat a lot)
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "2048"))
+INTENT_CACHE_TTL_SECONDS = float(os.getenv("INTENT_CACHE_TTL_SECONDS", "86400"))
+
+# Batch classification: queries per multi-item LLM prompt and prompts in flight
+INTENT_BATCH_LLM_CHUNK = int(os.getenv("INTENT_BATCH_LLM_CHUNK", "25"))
+INTENT_BATCH_LLM_CONCURRENCY = int(os.getenv("INTENT_BATCH_LLM_CONCURRENCY", "4"))
+
 
 class IntentRouter:
     """Routes user queries to appropriate application features"""
@@ -55,6 +70,26 @@ class IntentRouter:
     def __init__(self):
         """Initialize the intent router"""
         self.model = None
+        self.keyword_matcher = KeywordMatcher(
+            {feature_id: info["keywords"] for feature_id, info in self.FEATURE_MAP.items()}
+        )
+        self.local_classifier = EmbeddingIntentClassifier(self.FEATURE_MAP)
+        
+        # LLM results keyed by normalized query
+        self.classification_cache = LRUCache(INTENT_CACHE_SIZE, ttl=INTENT_CACHE_TTL_SECONDS)
+        self.help_cache = LRUCache(INTENT_CACHE_SIZE, ttl=INTENT_CACHE_TTL_SECONDS)
+        
+        # Prompt text that doesn't depend on the query, built once
+        self._classify_prompt_prefix = f"""You are an intelligent router for a financial application called ArthaGuide.
+
+Available features:
+{self._get_feature_descriptions()}
+
+"""
+        self._help_prompt_prefixes = {
+            feature_id: f"The user is currently on the '{feature_id}' page ({info['description']}).\n"
+            for feature_id, info in self.FEATURE_MAP.items()
+        }
     
     def _get_model(self):
         """Lazy load Gemini model on first use"""
@@ -70,7 +105,85 @@ class IntentRouter:
             descriptions.append(f"- {feature_id}: {info['description']} (e.g., {examples})")
         return "\n".join(descriptions)
     
-    def classify_intent(self, query: str, language: str = "en") -> Dict:
+    def _keyword_result(self, scores: Dict[str, int]) -> Dict:
+        """Route to the feature with the most keyword hits"""
+        route = max(scores.items(), key=lambda x: x[1])[0]
+        return {
+            "route": route,
+            "confidence": 0.85,
+            "explanation": f"Routing to {route} based on keywords",
+            "method": "keyword_matching",
+            "suggested_action": f"Navigating to {self.FEATURE_MAP[route]['description']}"
+        }
+    
+    def _embedding_result(self, route: str, confidence: float) -> Dict:
+        """Route chosen by the local embedding classifier"""
+        return {
+            "route": route,
+            "confidence": confidence,
+            "explanation": f"Routing to {route} based on similarity to its example queries",
+            "method": "embedding_classification",
+            "suggested_action": f"Navigating to {self.FEATURE_MAP[route]['description']}"
+        }
+    
+    def _llm_result(self, intent_data: Dict) -> Dict:
+        """
+        Normalize a classification returned by the LLM into a valid response
+        (known route, confidence as a float in [0, 1], string texts, no extra
+        keys), so nothing invalid is ever returned or cached
+        
+        Raises:
+            ValueError: If the LLM did not return a JSON object
+        """
+        if not isinstance(intent_data, dict):
+            raise ValueError(f"Expected a JSON object, got {type(intent_data).__name__}")
+        
+        route = intent_data.get("route")
+        if not isinstance(route, str) or route not in self.FEATURE_MAP:
+            route = "advisor"  # Default fallback
+        
+        try:
+            confidence = float(intent_data.get("confidence", 0.7))
+        except (TypeError, ValueError):
+            confidence = 0.7
+        if not math.isfinite(confidence):
+            confidence = 0.7
+        
+        explanation = intent_data.get("explanation")
+        suggested_action = intent_data.get("suggested_action")
+        return {
+            "route": route,
+            "confidence": min(max(confidence, 0.0), 1.0),
+            "explanation": explanation if isinstance(explanation, str) and explanation else f"Routing to {route}",
+            "suggested_action": (
+                suggested_action if isinstance(suggested_action, str) and suggested_action
+                else f"Navigating to {self.FEATURE_MAP[route]['description']}"
+            ),
+            "method": "llm_classification"
+        }
+    
+    @staticmethod
+    def _fallback_result() -> Dict:
+        """Last resort when every classifier failed: default to advisor"""
+        return {
+            "route": "advisor",
+            "confidence": 0.6,
+            "explanation": "Routing to advisor for personalized assistance",
+            "suggested_action": "Chat with our AI advisor for help",
+            "method": "default_fallback"
+        }
+    
+    @staticmethod
+    def _parse_json(text: str):
+        """Extract the JSON payload from an LLM response (optionally fenced)"""
+        result = text.strip()
+        if "```json" in result:
+            result = result.split("```json")[1].split("```")[0].strip()
+        elif "```" in result:
+            result = result.split("```")[1].split("```")[0].strip()
+        return json.loads(result)
+    
+    async def classify_intent(self, query: str, language: str = "en") -> Dict:
         """
         Classify user intent and route to appropriate feature
         
@@ -82,34 +195,25 @@ class IntentRouter:
             Dict with route, confidence, explanation, and suggested_action
         """
         # First try keyword-based matching for common queries
-        query_lower = query.lower()
-        
-        # Check for keyword matches
-        scores = {}
-        for feature_id, info in self.FEATURE_MAP.items():
-            score = sum(1 for keyword in info["keywords"] if keyword in query_lower)
-            if score > 0:
-                scores[feature_id] = score
+        # (single pass over the query for all features' keywords)
+        scores = self.keyword_matcher.match(query)
         
         # If we have a clear keyword match, use it
         if scores:
-            best_match = max(scores.items(), key=lambda x: x[1])
-            if best_match[1] >= 1:  # At least 1 keyword match (lowered threshold)
-                return {
-                    "route": best_match[0],
-                    "confidence": 0.85,
-                    "explanation": f"Routing to {best_match[0]} based on keywords",
-                    "method": "keyword_matching",
-                    "suggested_action": f"Navigating to {self.FEATURE_MAP[best_match[0]]['description']}"
-                }
-        
-        # If no clear keyword match, use LLM for intent classification
-        prompt = f"""You are an intelligent router for a financial application called ArthaGuide.
-
-Available features:
-{self._get_feature_descriptions()}
-
-User query: "{query}"
+            return self._keyword_result(scores)
+        
+        # Next try the local embedding classifier (no network call)
+        local_match = await asyncio.to_thread(self.local_classifier.classify, query)
+        if local_match:
+            return self._embedding_result(*local_match)
+        
+        # If still uncertain, use LLM for intent classification
+        cache_key = (normalize_text(query), language)
+        cached = self.classification_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
+        prompt = self._classify_prompt_prefix + f"""User query: "{query}"
 Language: {language}
 
 Analyze the user's intent and determine which feature would best serve their needs.
@@ -126,47 +230,129 @@ Choose the most appropriate feature based on the user's intent. If uncertain, de
 
         try:
             model = self._get_model()
-            response = model.generate_content(prompt)
-            result = response.text.strip()
+            response = await gemini_gateway.call(
+                lambda: model.generate_content_async(prompt),
+                deadline=request_deadline()
+            )
+            intent_data = self._llm_result(self._parse_json(response.text))
+            self.classification_cache.set(cache_key, dict(intent_data))
+            return intent_data
             
-            # Extract JSON from response
-            if "```json" in result:
-                result = result.split("```json")[1].split("```")[0].strip()
-            elif "```" in result:
-                result = result.split("```")[1].split("```")[0].strip()
+        except Exception as e:
+            return self._fallback_result()
+    
+    async def classify_intents(self, items: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Classify many queries at once
+        
+        Keyword and cache hits are resolved first, the rest go through the
+        local classifier in one vectorized encode, and only what is still
+        uncertain is sent to the LLM in multi-item prompts
+        
+        Args:
+            items: (query, language) pairs
             
-            import json
-            intent_data = json.loads(result)
+        Returns:
+            One classification dict per item, in input order
+        """
+        # Identical (normalized) queries are classified once
+        keys = [(normalize_text(query), language) for query, language in items]
+        queries = {}
+        for key, (query, _) in zip(keys, items):
+            queries.setdefault(key, query)
+        
+        results: Dict[Tuple[str, str], Dict] = {}
+        pending = []
+        for key, query in queries.items():
+            scores = self.keyword_matcher.match(query)
+            if scores:
+                results[key] = self._keyword_result(scores)
+                continue
+            cached = self.classification_cache.get(key)
+            if cached is not None:
+                results[key] = dict(cached)
+            else:
+                pending.append(key)
+        
+        if pending:
+            local_matches = await asyncio.to_thread(
+                self.local_classifier.classify_many, [queries[key] for key in pending]
+            )
+            leftovers = []
+            for key, local_match in zip(pending, local_matches):
+                if local_match:
+                    results[key] = self._embedding_result(*local_match)
+                else:
+                    leftovers.append(key)
             
-            # Validate route
-            if intent_data.get("route") not in self.FEATURE_MAP:
-                intent_data["route"] = "advisor"  # Default fallback
+            semaphore = asyncio.Semaphore(INTENT_BATCH_LLM_CONCURRENCY)
             
-            intent_data["method"] = "llm_classification"
-            return intent_data
+            async def classify_chunk(chunk):
+                async with semaphore:
+                    classified = await self._classify_with_llm([(queries[key], key[1]) for key in chunk])
+                for key, intent_data in zip(chunk, classified):
+                    if intent_data is None:
+                        results[key] = self._fallback_result()
+                    else:
+                        self.classification_cache.set(key, dict(intent_data))
+                        results[key] = intent_data
             
+            await asyncio.gather(*(
+                classify_chunk(leftovers[start:start + INTENT_BATCH_LLM_CHUNK])
+                for start in range(0, len(leftovers), INTENT_BATCH_LLM_CHUNK)
+            ))
+        
+        return [dict(results[key]) for key in keys]
+    
+    async def _classify_with_llm(self, items: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+        """
+        Classify several (query, language) pairs with a single LLM prompt
+        Items the model didn't answer or answered with something malformed
+        (or the whole chunk, on error) are None; callers neither cache nor
+        return those as LLM results
+        """
+        numbered = "\n".join(
+            f"{index}. [{language}] {json.dumps(query, ensure_ascii=False)}"
+            for index, (query, language) in enumerate(items, start=1)
+        )
+        prompt = self._classify_prompt_prefix + f"""User queries (number, [language], query):
+{numbered}
+
+Analyze each user's intent and determine which feature would best serve their needs.
+
+Respond with a JSON array containing one object per query:
+[
+    {{
+        "index": 1,
+        "route": "feature_id",
+        "confidence": 0.0-1.0,
+        "explanation": "brief explanation of why this route was chosen",
+        "suggested_action": "what the user should expect to see"
+    }}
+]
+
+Choose the most appropriate feature based on each user's intent. If uncertain, default to 'advisor' for questions or 'features' for general exploration."""
+
+        classified: List[Optional[Dict]] = [None] * len(items)
+        try:
+            model = self._get_model()
+            response = await gemini_gateway.call(
+                lambda: model.generate_content_async(prompt),
+                deadline=request_deadline()
+            )
+            for intent_data in self._parse_json(response.text):
+                index = intent_data.get("index") if isinstance(intent_data, dict) else None
+                if not isinstance(index, int) or isinstance(index, bool) or not 1 <= index <= len(items):
+                    continue
+                try:
+                    classified[index - 1] = self._llm_result(intent_data)
+                except ValueError:
+                    continue
         except Exception as e:
-            # Fallback to best keyword match if available
-            if scores:
-                best_match = max(scores.items(), key=lambda x: x[1])
-                return {
-                    "route": best_match[0],
-                    "confidence": 0.75,
-                    "explanation": f"Routing to {best_match[0]} based on keyword analysis",
-                    "suggested_action": f"Navigating to {self.FEATURE_MAP[best_match[0]]['description']}",
-                    "method": "keyword_fallback"
-                }
-            
-            # Last resort: default to advisor
-            return {
-                "route": "advisor",
-                "confidence": 0.6,
-                "explanation": "Routing to advisor for personalized assistance",
-                "suggested_action": "Chat with our AI advisor for help",
-                "method": "default_fallback"
-            }
+            print(f"⚠️  Batch intent classification failed for {len(items)} queries: {e}")
+        return classified
     
-    def get_contextual_help(self, current_route: str, query: str) -> str:
+    async def get_contextual_help(self, current_route: str, query: str) -> str:
         """
         Provide contextual help based on current location and query
         
@@ -180,17 +366,36 @@ Choose the most appropriate feature based on the user's intent. If uncertain, de
         feature_info = self.FEATURE_MAP.get(current_route, {})
         description = feature_info.get("description", "")
         
-        prompt = f"""The user is currently on the '{current_route}' page ({description}).
-They asked: "{query}"
+        cache_key = (current_route, normalize_text(query))
+        cached = self.help_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        prefix = self._help_prompt_prefixes.get(current_route)
+        if prefix is None:
+            prefix = f"The user is currently on the '{current_route}' page ({description}).\n"
+        prompt = prefix + f"""They asked: "{query}"
 
 Provide a brief, helpful response (2-3 sentences) explaining what they can do on this page or guiding them to the right feature."""
 
         try:
             model = self._get_model()
-            response = model.generate_content(prompt)
-            return response.text.strip()
+            response = await gemini_gateway.call(
+                lambda: model.generate_content_async(prompt),
+                deadline=request_deadline()
+            )
+            help_text = response.text.strip()
+            self.help_cache.set(cache_key, help_text)
+            return help_text
         except:
             return f"You're on the {current_route} page. {description}"
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the LLM result caches"""
+        return {
+            "classification": self.classification_cache.stats(),
+            "help": self.help_cache.stats()
+        }
 
 
 # Singleton instance
@@ -0,0 +1,114 @@
+"""
+Compiled Multi-Keyword Matcher (Aho-Corasick)
+Finds every keyword of every label in a single pass over the text, with
+word-boundary checks so "emi" does not match inside "premium"
+"""
+
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+# English plural endings accepted after a keyword ("loan" matches "loans")
+PLURAL_SUFFIXES = ("s", "es")
+
+
+def _is_word_char(char: str) -> bool:
+    """Letters, digits, underscore and combining marks (Devanagari/Kannada vowel signs)"""
+    return char.isalnum() or char == "_" or unicodedata.category(char).startswith("M")
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over lowercased keywords
+    
+    Boundary rules:
+    - A keyword that starts with a word character must not be preceded by one
+    - An ASCII keyword that ends with a word character must be followed by a
+      non-word character, optionally after a plural suffix ("s"/"es")
+    - Non-ASCII (Hindi/Kannada) keywords only need the left boundary, since
+      those languages attach case markers and suffixes to the word
+    """
+    
+    def __init__(self, keywords_by_label: Dict[str, Iterable[str]]):
+        self.labels: List[str] = list(keywords_by_label)
+        
+        # keyword -> labels that list it
+        keyword_labels: Dict[str, Set[str]] = {}
+        for label, keywords in keywords_by_label.items():
+            for keyword in keywords:
+                keyword = keyword.lower().strip()
+                if keyword:
+                    keyword_labels.setdefault(keyword, set()).add(label)
+        self.keywords: List[str] = list(keyword_labels)
+        self._keyword_labels = keyword_labels
+        
+        # Trie
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[int]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append(index)
+        
+        # Failure links (BFS), merging outputs along the failure chain
+        self._fail: List[int] = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+    
+    def _is_bounded(self, text: str, start: int, end: int, keyword: str) -> bool:
+        if _is_word_char(keyword[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if not _is_word_char(keyword[-1]) or not keyword.isascii():
+            return True
+        if end == len(text) or not _is_word_char(text[end]):
+            return True
+        for suffix in PLURAL_SUFFIXES:
+            after = end + len(suffix)
+            if text.startswith(suffix, end) and (after == len(text) or not _is_word_char(text[after])):
+                return True
+        return False
+    
+    def find(self, text: str) -> List[Tuple[int, str]]:
+        """All bounded keyword occurrences as (start offset, keyword) in the lowercased text"""
+        text = text.lower()
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._outputs[state]:
+                keyword = self.keywords[index]
+                start = position + 1 - len(keyword)
+                if self._is_bounded(text, start, position + 1, keyword):
+                    matches.append((start, keyword))
+        return matches
+    
+    def match(self, text: str) -> Dict[str, int]:
+        """
+        Number of distinct keywords of each label found in `text`
+        Labels without hits are omitted; order follows the label order given
+        at construction
+        """
+        hits = {keyword for _, keyword in self.find(text)}
+        counts = dict.fromkeys(self.labels, 0)
+        for keyword in hits:
+            for label in self._keyword_labels[keyword]:
+                counts[label] += 1
+        return {label: count for label, count in counts.items() if count}
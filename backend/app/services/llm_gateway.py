@@ -0,0 +1,304 @@
+"""
+LLM Gateway: bounded concurrency, deadlines, retries and circuit breaking
+for calls to external LLM providers (OpenAI, Gemini)
+
+Callers keep their existing fallback handling: every failure mode here
+surfaces as an exception (CircuitOpenError, asyncio.TimeoutError or the
+provider's own error) that the existing `except` branches already catch.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+import openai
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:
+    google_exceptions = None
+
+T = TypeVar("T")
+
+# End-to-end time budget for the LLM part of one API request
+REQUEST_BUDGET_SECONDS = float(os.getenv("LLM_REQUEST_BUDGET_SECONDS", "20"))
+
+
+def request_deadline(budget: float = REQUEST_BUDGET_SECONDS) -> float:
+    """Absolute (monotonic) deadline for a request starting now"""
+    return time.monotonic() + budget
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider that is currently marked unhealthy"""
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker
+    - closed: calls flow; `failure_threshold` consecutive failures open it
+    - open: calls are rejected until `reset_timeout` seconds have passed
+    - half-open: one probe call is let through; success closes, failure re-opens
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+    
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._probe_in_flight = False
+        # Half-open: admit a single probe
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+    
+    def release_probe(self):
+        """Give back a half-open probe slot that was never used (deadline hit, caller cancelled)"""
+        self._probe_in_flight = False
+    
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+    
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """
+    Wraps calls to one provider with:
+    - a semaphore bounding in-flight calls; waiting for a slot is bounded by
+      the caller's deadline but is local, so it never counts as a provider failure
+    - a per-attempt timeout (clipped to the caller's deadline) on the provider call itself
+    - retries with jittered exponential backoff for transient errors
+    - a circuit breaker that fails fast while the provider is unhealthy
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        timeout: float,
+        transient_errors: Tuple[Type[BaseException], ...],
+        max_retries: int = 2,
+        base_backoff: float = 0.25,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.transient_errors = (asyncio.TimeoutError,) + transient_errors
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queue_timeouts = 0
+    
+    def _remaining(self, deadline: Optional[float]) -> float:
+        if deadline is None:
+            return self.timeout
+        return min(self.timeout, deadline - time.monotonic())
+    
+    async def _acquire(self, deadline: Optional[float]):
+        """Wait for a concurrency slot, at most until the deadline (or one timeout without one)"""
+        budget = self.timeout if deadline is None else deadline - time.monotonic()
+        if budget <= 0:
+            raise asyncio.TimeoutError(f"{self.name} request deadline exceeded")
+        try:
+            async with asyncio.timeout(budget):
+                await self._semaphore.acquire()
+        except asyncio.TimeoutError:
+            self.queue_timeouts += 1
+            raise asyncio.TimeoutError(f"{self.name} timed out waiting for a free slot") from None
+    
+    def _start_attempt(self, deadline: Optional[float]) -> float:
+        """Breaker check for an attempt holding a slot; returns its timeout"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        remaining = self._remaining(deadline)
+        if remaining <= 0:
+            self.breaker.release_probe()
+            raise asyncio.TimeoutError(f"{self.name} request deadline exceeded")
+        return remaining
+    
+    def _deadline_expired(self, error: BaseException, remaining: float) -> bool:
+        """
+        A timeout cut short by the caller's deadline (not the provider timeout)
+        says nothing about the provider's health; release the probe and give up
+        """
+        if isinstance(error, asyncio.TimeoutError) and remaining < self.timeout:
+            self.breaker.release_probe()
+            return True
+        return False
+    
+    async def _backoff(self, attempt: int, deadline: Optional[float]):
+        backoff = self.base_backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        if deadline is not None:
+            backoff = min(backoff, max(deadline - time.monotonic(), 0))
+        await asyncio.sleep(backoff)
+    
+    async def call(self, factory: Callable[[], Awaitable[T]], deadline: Optional[float] = None) -> T:
+        """
+        Run `factory()` (which must create a fresh awaitable per attempt)
+        under the gateway's limits
+        
+        Args:
+            factory: e.g. lambda: client.chat.completions.create(...)
+            deadline: Absolute monotonic deadline from `request_deadline()`
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(deadline)
+            try:
+                remaining = self._start_attempt(deadline)
+                self.in_flight += 1
+                try:
+                    async with asyncio.timeout(remaining):
+                        result = await factory()
+                except self.transient_errors as e:
+                    if self._deadline_expired(e, remaining):
+                        raise
+                    self.breaker.record_failure()
+                    if attempt == self.max_retries:
+                        raise
+                except Exception:
+                    # Non-transient errors (bad request, auth) mean the provider
+                    # answered; they are the caller's to handle
+                    self.breaker.record_success()
+                    raise
+                except BaseException:
+                    # Caller cancelled mid-call
+                    self.breaker.release_probe()
+                    raise
+                else:
+                    self.breaker.record_success()
+                    return result
+                finally:
+                    self.in_flight -= 1
+            finally:
+                self._semaphore.release()
+            
+            # Back off without holding a slot
+            await self._backoff(attempt, deadline)
+    
+    async def stream(self, factory: Callable[[], Awaitable[Any]], deadline: Optional[float] = None) -> AsyncIterator[Any]:
+        """
+        Streaming counterpart of `call`: `factory()` opens the stream and its
+        chunks are yielded while the concurrency slot is held. Each chunk must
+        arrive within the per-attempt timeout and before the deadline; attempts
+        are retried only until the first chunk has been yielded
+        
+        Args:
+            factory: e.g. lambda: client.chat.completions.create(..., stream=True)
+            deadline: Absolute monotonic deadline from `request_deadline()`
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(deadline)
+            started = False
+            try:
+                remaining = self._start_attempt(deadline)
+                self.in_flight += 1
+                try:
+                    async with asyncio.timeout(remaining):
+                        stream = await factory()
+                    try:
+                        chunks = stream.__aiter__()
+                        while True:
+                            remaining = self._remaining(deadline)
+                            if remaining <= 0:
+                                raise asyncio.TimeoutError(f"{self.name} request deadline exceeded")
+                            try:
+                                async with asyncio.timeout(remaining):
+                                    chunk = await chunks.__anext__()
+                            except StopAsyncIteration:
+                                break
+                            started = True
+                            yield chunk
+                    finally:
+                        close = getattr(stream, "close", None)
+                        if close is not None:
+                            await close()
+                except self.transient_errors as e:
+                    if self._deadline_expired(e, remaining):
+                        raise
+                    self.breaker.record_failure()
+                    if started or attempt == self.max_retries:
+                        raise
+                except Exception:
+                    self.breaker.record_success()
+                    raise
+                except BaseException:
+                    # Caller cancelled or stopped reading
+                    self.breaker.release_probe()
+                    raise
+                else:
+                    self.breaker.record_success()
+                    return
+                finally:
+                    self.in_flight -= 1
+            finally:
+                self._semaphore.release()
+            
+            await self._backoff(attempt, deadline)
+    
+    def stats(self) -> Dict:
+        return {
+            "provider": self.name,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_timeouts": self.queue_timeouts
+        }
+
+
+OPENAI_TRANSIENT_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError
+)
+
+GEMINI_TRANSIENT_ERRORS = (
+    (
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.InternalServerError,
+        google_exceptions.TooManyRequests
+    )
+    if google_exceptions is not None
+    else ()
+)
+
+openai_gateway = LLMGateway(
+    "openai",
+    max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "32")),
+    timeout=float(os.getenv("OPENAI_TIMEOUT_SECONDS", "15")),
+    transient_errors=OPENAI_TRANSIENT_ERRORS
+)
+
+gemini_gateway = LLMGateway(
+    "gemini",
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "32")),
+    timeout=float(os.getenv("GEMINI_TIMEOUT_SECONDS", "8")),
+    transient_errors=GEMINI_TRANSIENT_ERRORS
+)
@@ -1,14 +1,15 @@
-import os
-from openai import OpenAI
 from dotenv import load_dotenv
+from app.services.llm_clients import get_openai_client
+from app.services.llm_gateway import openai_gateway
 
 load_dotenv()
 
 class LoanAdvisor:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Shared, pooled AsyncOpenAI client
+        self.client = get_openai_client()
         
-    def get_advice(self, user_message: str, language: str, financial_data: dict = None) -> str:
+    async def get_advice(self, user_message: str, language: str, financial_data: dict = None) -> str:
         """
         Generate loan advice using OpenAI API
         
@@ -22,14 +23,16 @@ class LoanAdvisor:
         context = self._build_context(financial_data) if financial_data else ""
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"{context}\n\nUser Question: {user_message}"}
-                ],
-                temperature=0.7,
-                max_tokens=300
+            response = await openai_gateway.call(
+                lambda: self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": f"{context}\n\nUser Question: {user_message}"}
+                    ],
+                    temperature=0.7,
+                    max_tokens=300
+                )
             )
             
             return response.choices[0].message.content
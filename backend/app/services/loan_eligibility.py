@@ -0,0 +1,57 @@
+"""
+Loan Eligibility helpers shared by vector search and the affordability engine
+Structured limits parsed from a product's free-text eligibility, and numeric
+fields read from a user profile (no database or model dependencies)
+"""
+
+import re
+from typing import Dict, Optional
+
+# Patterns for pulling structured limits out of free-text eligibility
+AGE_RANGE_REGEX = re.compile(r'age\s*(\d{2})\s*-\s*(\d{2})', re.IGNORECASE)
+CREDIT_SCORE_REGEX = re.compile(r'credit score\s*(\d{3})', re.IGNORECASE)
+INCOME_REGEX = re.compile(
+    r'income\s*₹\s*([0-9,]+)|₹\s*([0-9,]+)\+?\s*(?:monthly\s+)?income',
+    re.IGNORECASE
+)
+
+
+def loan_eligibility_fields(product_data: Dict) -> Dict:
+    """
+    Numeric eligibility limits (min_income, min_credit_score, min_age,
+    max_age) parsed from the free-text `eligibility` field; values the
+    catalog already provides explicitly are left alone
+    """
+    eligibility = product_data.get("eligibility", "")
+    fields = {}
+
+    age_match = AGE_RANGE_REGEX.search(eligibility)
+    if age_match:
+        fields["min_age"] = int(age_match.group(1))
+        fields["max_age"] = int(age_match.group(2))
+
+    credit_match = CREDIT_SCORE_REGEX.search(eligibility)
+    if credit_match:
+        fields["min_credit_score"] = int(credit_match.group(1))
+
+    income_match = INCOME_REGEX.search(eligibility)
+    if income_match:
+        amount = income_match.group(1) or income_match.group(2)
+        fields["min_income"] = float(amount.replace(',', ''))
+
+    return {key: value for key, value in fields.items() if key not in product_data}
+
+
+def profile_number(user_profile: Optional[Dict], *keys: str) -> Optional[float]:
+    """First numeric value found under any of `keys` (camelCase or snake_case)"""
+    if not user_profile:
+        return None
+    for key in keys:
+        value = user_profile.get(key)
+        if value in (None, ""):
+            continue
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            continue
+    return None
@@ -4,12 +4,59 @@ Implements domain-specific retrieval for India's gig worker finance domain
 """
 
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
-from sentence_transformers import SentenceTransformer
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, PointIdsList, Filter, FieldCondition, MatchValue,
+    Range, IsEmptyCondition, PayloadField, PayloadSchemaType, HasIdCondition
+)
+from app.services.embedding_cache import get_encoder
+from app.services.cache import LRUCache, normalize_text
+from app.services.loan_eligibility import loan_eligibility_fields, profile_number
+from app.services.sparse_index import BM25Index, reciprocal_rank_fusion
+import numpy as np
 import os
-from typing import List, Dict, Optional
+import json
+import hashlib
+from typing import List, Dict, Optional, Iterable, Tuple
+from itertools import islice
 import uuid
 
+# Documents per encode/upsert round-trip during bulk ingestion
+DEFAULT_BATCH_SIZE = int(os.getenv("RAG_INGEST_BATCH_SIZE", "64"))
+
+# Namespace for deterministic (UUIDv5) point IDs
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "arthaguide.app")
+
+# Payload key holding the content fingerprint of the source document
+FINGERPRINT_KEY = "fingerprint"
+
+# Numeric loan-product fields used for eligibility pre-filtering (indexed in server mode)
+LOAN_NUMERIC_FIELDS = {
+    "interest_rate": PayloadSchemaType.FLOAT,
+    "min_amount": PayloadSchemaType.FLOAT,
+    "max_amount": PayloadSchemaType.FLOAT,
+    "min_income": PayloadSchemaType.FLOAT,
+    "min_credit_score": PayloadSchemaType.INTEGER,
+    "min_age": PayloadSchemaType.INTEGER,
+    "max_age": PayloadSchemaType.INTEGER
+}
+
+# Recent query embeddings kept in process (keyed by normalized query text)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "2048"))
+
+# Ranking for advice/regulation search: "dense", "sparse" (BM25) or "hybrid" (RRF of both)
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+
+# In hybrid mode the dense search (including the query embedding) is skipped
+# when the best BM25 hit contains every query term and outscores the runner-up
+# by this factor
+SPARSE_SKIP_RATIO = float(os.getenv("RAG_SPARSE_SKIP_RATIO", "1.5"))
+
+# Storage backend: "memory" (per-process), "local" (embedded on-disk) or "server"
+QDRANT_MODE = os.getenv("QDRANT_MODE", "memory")
+QDRANT_PATH = os.getenv("QDRANT_PATH", ".cache/qdrant")
+QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY") or None
+
 class FinancialMemoryRAG:
     """
     RAG system for financial knowledge using Qdrant vector database
@@ -20,13 +67,25 @@ class FinancialMemoryRAG:
     - Regulatory compliance info
     """
     
-    def __init__(self):
-        # Initialize Qdrant client in memory mode
-        self.client = QdrantClient(":memory:")
+    def __init__(
+        self,
+        mode: str = QDRANT_MODE,
+        path: str = QDRANT_PATH,
+        url: str = QDRANT_URL,
+        api_key: Optional[str] = QDRANT_API_KEY
+    ):
+        # Initialize Qdrant client for the configured storage backend
+        self.mode = mode
+        self.client = self._create_client(mode, path, url, api_key)
         
-        # Initialize embedding model
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        # Initialize embedding model behind the persistent embedding cache
+        self.model_name = 'all-MiniLM-L6-v2'
+        self.encoder = get_encoder(self.model_name)
         self.vector_size = 384  # all-MiniLM-L6-v2 dimension
+        self._query_cache = LRUCache(QUERY_CACHE_SIZE)
+        
+        # Bumped whenever stored knowledge changes (invalidates answer caches)
+        self.kb_version = 0
         
         # Collection names
         self.collections = {
@@ -36,9 +95,58 @@ class FinancialMemoryRAG:
             "regulatory_info": "arthaguide_regulatory_info"
         }
         
+        # Searchable-text builders used during ingestion
+        self._text_builders = {
+            "loan_products": self._loan_product_text,
+            "financial_advice": self._financial_advice_text,
+            "regulatory_info": self._regulatory_info_text
+        }
+        
+        # Payload fields that identify a document; they determine its point ID
+        self._identity_fields = {
+            "loan_products": ("lender", "product_name"),
+            "financial_advice": ("question", "language"),
+            "regulatory_info": ("authority", "title")
+        }
+        
+        # Structured payload fields derived from each document at ingest
+        self._payload_enrichers = {
+            "loan_products": loan_eligibility_fields
+        }
+        
+        # Lexical (BM25) indexes kept alongside the vector collections
+        self._sparse_text_builders = {
+            "financial_advice": self._financial_advice_sparse_text,
+            "regulatory_info": self._regulatory_info_sparse_text
+        }
+        self.sparse_indexes = {
+            collection: BM25Index() for collection in self._sparse_text_builders
+        }
+        
         # Initialize collections
         self._initialize_collections()
         
+        # A persistent store may already hold documents from a previous run
+        if self.mode != "memory":
+            self._rebuild_sparse_indexes()
+        
+    @staticmethod
+    def _create_client(mode: str, path: str, url: str, api_key: Optional[str]) -> QdrantClient:
+        """
+        Build the Qdrant client
+        - memory: private in-process store, rebuilt by every worker
+        - local: embedded store persisted under `path` (single process at a time)
+        - server: shared Qdrant server (see docker-compose.yml)
+        """
+        if mode == "memory":
+            return QdrantClient(":memory:")
+        if mode == "local":
+            os.makedirs(path, exist_ok=True)
+            return QdrantClient(path=path)
+        if mode == "server":
+            return QdrantClient(url=url, api_key=api_key)
+        raise ValueError(f"Unknown QDRANT_MODE '{mode}' (expected memory, local or server)")
+        
     def _initialize_collections(self):
         """Create Qdrant collections if they don't exist"""
         for collection_name in self.collections.values():
@@ -52,6 +160,270 @@ class FinancialMemoryRAG:
                         distance=Distance.COSINE
                     )
                 )
+        
+        # Payload indexes let the server restrict ANN search to eligible
+        # products; the embedded/in-memory engines ignore them
+        if self.mode == "server":
+            for field_name, field_schema in LOAN_NUMERIC_FIELDS.items():
+                self.client.create_payload_index(
+                    collection_name=self.collections["loan_products"],
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+                
+    def _loan_product_text(self, product_data: Dict) -> str:
+        """Searchable text for a loan product"""
+        return f"{product_data['lender']} {product_data['product_name']} - Interest rate {product_data['interest_rate']}% APR. Loan amount from ₹{product_data['min_amount']} to ₹{product_data['max_amount']}. {product_data['eligibility']}. {product_data['features']}. Best for {product_data['target_audience']}."
+    
+    def _financial_advice_text(self, advice_data: Dict) -> str:
+        """Searchable text for a financial advice entry"""
+        return f"{advice_data['category']}: {advice_data['question']} - {advice_data['answer']}"
+    
+    def _regulatory_info_text(self, regulation_data: Dict) -> str:
+        """Searchable text for a regulation entry"""
+        return f"{regulation_data['authority']} - {regulation_data['title']}: {regulation_data['description']}"
+    
+    def _financial_advice_sparse_text(self, advice_data: Dict) -> str:
+        """Lexical text for an advice entry, including its curated keywords"""
+        return f"{self._financial_advice_text(advice_data)} {' '.join(advice_data.get('keywords', []))}"
+    
+    def _regulatory_info_sparse_text(self, regulation_data: Dict) -> str:
+        """Lexical text for a regulation entry"""
+        return f"{self._regulatory_info_text(regulation_data)} {regulation_data.get('applicability', '')}"
+    
+    def _index_sparse(self, collection: str, point_id: str, payload: Dict):
+        """Add a stored point to the collection's BM25 index, if it has one"""
+        index = self.sparse_indexes.get(collection)
+        if index is not None:
+            public_payload = self._public_payload(payload)
+            index.add(point_id, self._sparse_text_builders[collection](public_payload), public_payload)
+    
+    def _rebuild_sparse_indexes(self):
+        """Populate the BM25 indexes from whatever the vector store already holds"""
+        for collection in self.sparse_indexes:
+            offset = None
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.collections[collection],
+                    limit=256,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=False
+                )
+                for point in points:
+                    self._index_sparse(collection, str(point.id), point.payload)
+                if offset is None:
+                    break
+    
+    def point_id(self, collection: str, document: Dict) -> str:
+        """Deterministic point ID derived from the document's identity fields"""
+        identity = "\x1f".join(str(document[field]) for field in self._identity_fields[collection])
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{collection}\x1f{identity}"))
+    
+    @staticmethod
+    def fingerprint(document: Dict) -> str:
+        """Content fingerprint of a source document (ignores a stored fingerprint)"""
+        content = {key: value for key, value in document.items() if key != FINGERPRINT_KEY}
+        canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _public_payload(payload: Dict) -> Dict:
+        """Strip bookkeeping fields before returning a payload to callers"""
+        return {key: value for key, value in payload.items() if key != FINGERPRINT_KEY}
+    
+    def ingest(
+        self,
+        collection: str,
+        documents: Iterable[Dict],
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> int:
+        """
+        Bulk-load documents into a collection
+        
+        Documents are accumulated into chunks of `batch_size`; each chunk is
+        embedded with a single encoder call and written with a single upsert.
+        Point IDs are deterministic, so re-ingesting a document overwrites it.
+        
+        Args:
+            collection: Collection key ("loan_products", "financial_advice", "regulatory_info")
+            documents: Iterable of payload dicts (may be a generator)
+            batch_size: Number of documents per encode/upsert round-trip
+            
+        Returns:
+            Number of documents ingested
+        """
+        build_text = self._text_builders[collection]
+        enrich = self._payload_enrichers.get(collection, lambda document: {})
+        collection_name = self.collections[collection]
+        documents = iter(documents)
+        total = 0
+        
+        while True:
+            chunk = list(islice(documents, batch_size))
+            if not chunk:
+                break
+            
+            texts = [build_text(document) for document in chunk]
+            vectors = self.encoder.encode(texts, batch_size=batch_size)
+            
+            points = [
+                PointStruct(
+                    id=self.point_id(collection, document),
+                    vector=vector.tolist(),
+                    payload={**document, **enrich(document), FINGERPRINT_KEY: self.fingerprint(document)}
+                )
+                for document, vector in zip(chunk, vectors)
+            ]
+            
+            self.client.upsert(
+                collection_name=collection_name,
+                points=points
+            )
+            for point in points:
+                self._index_sparse(collection, point.id, point.payload)
+            total += len(points)
+        
+        if total:
+            self.kb_version += 1
+        return total
+    
+    def stored_fingerprints(self, collection: str) -> Dict[str, Optional[str]]:
+        """Map of point ID -> stored content fingerprint for every point in a collection"""
+        collection_name = self.collections[collection]
+        fingerprints = {}
+        offset = None
+        
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=256,
+                offset=offset,
+                with_payload=[FINGERPRINT_KEY],
+                with_vectors=False
+            )
+            for point in points:
+                fingerprints[str(point.id)] = (point.payload or {}).get(FINGERPRINT_KEY)
+            if offset is None:
+                break
+        
+        return fingerprints
+    
+    def delete_points(self, collection: str, point_ids: List[str]):
+        """Remove points from a collection by ID"""
+        if not point_ids:
+            return
+        self.client.delete(
+            collection_name=self.collections[collection],
+            points_selector=PointIdsList(points=list(point_ids))
+        )
+        index = self.sparse_indexes.get(collection)
+        if index is not None:
+            for point_id in point_ids:
+                index.remove(str(point_id))
+        self.kb_version += 1
+    
+    def is_seeded(self) -> bool:
+        """True when every knowledge-base collection already holds points"""
+        return all(
+            self.client.count(self.collections[collection], exact=False).count > 0
+            for collection in self._text_builders
+        )
+    
+    def export_snapshot(self, path: str):
+        """
+        Write every knowledge-base collection (IDs, vectors, payloads) to a
+        single .npz artifact that `load_snapshot` can restore without
+        re-embedding anything
+        """
+        arrays = {
+            "model_name": np.array(self.model_name),
+            "vector_size": np.array(self.vector_size)
+        }
+        
+        for collection in self._text_builders:
+            ids, vectors, payloads = [], [], []
+            offset = None
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.collections[collection],
+                    limit=256,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True
+                )
+                for point in points:
+                    ids.append(str(point.id))
+                    vectors.append(point.vector)
+                    payloads.append(json.dumps(point.payload, ensure_ascii=False))
+                if offset is None:
+                    break
+            
+            arrays[f"{collection}__ids"] = np.array(ids, dtype=str)
+            arrays[f"{collection}__vectors"] = np.asarray(vectors, dtype=np.float32).reshape(-1, self.vector_size)
+            arrays[f"{collection}__payloads"] = np.array(payloads, dtype=str)
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Write to a temp file first so readers never see a partial snapshot
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as snapshot_file:
+            np.savez(snapshot_file, **arrays)
+        os.replace(temp_path, path)
+    
+    def load_snapshot(self, path: str, batch_size: int = 256) -> bool:
+        """
+        Restore collections from an `export_snapshot` artifact
+        
+        Returns:
+            False (and loads nothing) if the snapshot was built with a
+            different embedding model
+        """
+        with np.load(path, allow_pickle=False) as snapshot:
+            if str(snapshot["model_name"]) != self.model_name or int(snapshot["vector_size"]) != self.vector_size:
+                return False
+            
+            for collection in self._text_builders:
+                ids = snapshot[f"{collection}__ids"]
+                vectors = snapshot[f"{collection}__vectors"]
+                payloads = snapshot[f"{collection}__payloads"]
+                
+                for start in range(0, len(ids), batch_size):
+                    points = [
+                        PointStruct(
+                            id=str(point_id),
+                            vector=vector.tolist(),
+                            payload=json.loads(str(payload))
+                        )
+                        for point_id, vector, payload in zip(
+                            ids[start:start + batch_size],
+                            vectors[start:start + batch_size],
+                            payloads[start:start + batch_size]
+                        )
+                    ]
+                    self.client.upsert(
+                        collection_name=self.collections[collection],
+                        points=points
+                    )
+                    for point in points:
+                        self._index_sparse(collection, point.id, point.payload)
+        
+        self.kb_version += 1
+        return True
+    
+    def add_loan_products_batch(self, products: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Bulk-add loan products (see `add_loan_product` for the payload shape)"""
+        return self.ingest("loan_products", products, batch_size)
+    
+    def add_financial_advice_batch(self, advice: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Bulk-add financial advice (see `add_financial_advice` for the payload shape)"""
+        return self.ingest("financial_advice", advice, batch_size)
+    
+    def add_regulatory_info_batch(self, regulations: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Bulk-add regulations (see `add_regulatory_info` for the payload shape)"""
+        return self.ingest("regulatory_info", regulations, batch_size)
                 
     def add_loan_product(self, product_data: Dict):
         """
@@ -68,23 +440,7 @@ class FinancialMemoryRAG:
             "target_audience": str
         }
         """
-        # Create searchable text
-        text = f"{product_data['lender']} {product_data['product_name']} - Interest rate {product_data['interest_rate']}% APR. Loan amount from ₹{product_data['min_amount']} to ₹{product_data['max_amount']}. {product_data['eligibility']}. {product_data['features']}. Best for {product_data['target_audience']}."
-        
-        # Generate embedding
-        vector = self.encoder.encode(text).tolist()
-        
-        # Store in Qdrant
-        point = PointStruct(
-            id=str(uuid.uuid4()),
-            vector=vector,
-            payload=product_data
-        )
-        
-        self.client.upsert(
-            collection_name=self.collections["loan_products"],
-            points=[point]
-        )
+        self.ingest("loan_products", [product_data])
         
     def add_financial_advice(self, advice_data: Dict):
         """
@@ -97,19 +453,7 @@ class FinancialMemoryRAG:
             "keywords": List[str]
         }
         """
-        text = f"{advice_data['category']}: {advice_data['question']} - {advice_data['answer']}"
-        vector = self.encoder.encode(text).tolist()
-        
-        point = PointStruct(
-            id=str(uuid.uuid4()),
-            vector=vector,
-            payload=advice_data
-        )
-        
-        self.client.upsert(
-            collection_name=self.collections["financial_advice"],
-            points=[point]
-        )
+        self.ingest("financial_advice", [advice_data])
         
     def add_regulatory_info(self, regulation_data: Dict):
         """
@@ -122,54 +466,198 @@ class FinancialMemoryRAG:
             "source_url": str
         }
         """
-        text = f"{regulation_data['authority']} - {regulation_data['title']}: {regulation_data['description']}"
-        vector = self.encoder.encode(text).tolist()
+        self.ingest("regulatory_info", [regulation_data])
         
-        point = PointStruct(
-            id=str(uuid.uuid4()),
-            vector=vector,
-            payload=regulation_data
-        )
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Canonical form of a query for caching; all-MiniLM-L6-v2 is uncased and
+        ignores whitespace, so this does not change the embedding
+        """
+        return normalize_text(query)
+        
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a user query once per request so the vector can be shared across
+        collection searches; recent queries are served from an LRU cache
+        """
+        key = self.normalize_query(query)
+        vector = self._query_cache.get(key)
+        if vector is None:
+            vector = self.encoder.model.encode(key).tolist()
+            self._query_cache.set(key, vector)
+        return vector
         
-        self.client.upsert(
-            collection_name=self.collections["regulatory_info"],
-            points=[point]
+    @staticmethod
+    def _within_limit(key: str, value: float, bound: str) -> Filter:
+        """Product limit `key` admits `value`, or the product sets no such limit"""
+        limit = Range(lte=value) if bound == "min" else Range(gte=value)
+        return Filter(
+            should=[
+                FieldCondition(key=key, range=limit),
+                IsEmptyCondition(is_empty=PayloadField(key=key))
+            ]
         )
+    
+    def _eligibility_filter(self, user_profile: Optional[Dict]) -> Optional[Filter]:
+        """
+        Build a payload filter that keeps only products the user qualifies for
+        Recognized profile fields: monthlyIncome, creditScore, age, loanAmount
+        """
+        if not user_profile:
+            return None
+        
+        conditions = []
+        
+        income = profile_number(user_profile, "monthlyIncome", "monthly_income")
+        if income is not None:
+            conditions.append(self._within_limit("min_income", income, "min"))
+        
+        credit_score = profile_number(user_profile, "creditScore", "credit_score")
+        if credit_score is not None:
+            conditions.append(self._within_limit("min_credit_score", credit_score, "min"))
+        
+        age = profile_number(user_profile, "age")
+        if age is not None:
+            conditions.append(self._within_limit("min_age", age, "min"))
+            conditions.append(self._within_limit("max_age", age, "max"))
+        
+        amount = profile_number(user_profile, "loanAmount", "loan_amount")
+        if amount is not None:
+            conditions.append(self._within_limit("min_amount", amount, "min"))
+            conditions.append(self._within_limit("max_amount", amount, "max"))
+        
+        return Filter(must=conditions) if conditions else None
         
     def search_loan_products(
         self, 
         query: str, 
         user_profile: Optional[Dict] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict]:
         """
         Semantic search for relevant loan products
-        Filters by user's financial profile if provided
+        Filters by user's financial profile if provided, so only products the
+        user is eligible for are ranked
+        Pass `query_vector` to reuse an embedding computed by `embed_query`
         """
-        # Use query_text instead of manual encoding for in-memory client
-        results = self.client.query(
+        results = self.client.query_points(
             collection_name=self.collections["loan_products"],
-            query_text=query,
-            limit=top_k
-        )
+            query=query_vector or self.embed_query(query),
+            limit=top_k,
+            query_filter=self._eligibility_filter(user_profile)
+        ).points
         
         return [
             {
                 "score": hit.score,
-                **hit.payload
+                **self._public_payload(hit.payload)
             }
             for hit in results
         ]
         
+    def _ranked_hits(
+        self,
+        collection: str,
+        query: str,
+        top_k: int,
+        query_vector: Optional[List[float]] = None,
+        query_filter: Optional[Filter] = None,
+        where: Optional[Dict] = None,
+        mode: str = RETRIEVAL_MODE
+    ) -> List[Tuple[float, Dict]]:
+        """
+        Rank a collection's documents for a query
+        
+        Args:
+            mode: "dense" (vector only), "sparse" (BM25 only) or "hybrid"
+                  (reciprocal-rank fusion of both; the dense search is skipped
+                  when BM25 finds a high-confidence exact match)
+            query_filter / where: The same constraints expressed for Qdrant
+                  and for the BM25 index respectively
+            
+        Returns:
+            List of (score, payload), best first. When the dense search runs,
+            `score` is the dense cosine similarity (RRF only decides the
+            order), so it is on the same scale as other collections'
+            dense-only scores. Sparse-only results (mode "sparse", or the
+            exact-match skip) never embed the query; their score is the share
+            of query terms the document contains (BM25 coverage, 0-1)
+        """
+        index = self.sparse_indexes.get(collection)
+        candidates = max(top_k * 3, 10)
+        
+        if mode == "dense" or index is None:
+            results = self.client.query_points(
+                collection_name=self.collections[collection],
+                query=query_vector or self.embed_query(query),
+                limit=top_k,
+                query_filter=query_filter
+            ).points
+            return [(hit.score, hit.payload) for hit in results]
+        
+        sparse_hits = index.search(query, candidates, where)
+        
+        exact_match = bool(sparse_hits) and index.term_coverage(sparse_hits[0][0], query) == 1.0 and (
+            len(sparse_hits) == 1 or sparse_hits[0][1] >= SPARSE_SKIP_RATIO * sparse_hits[1][1]
+        )
+        
+        if mode == "sparse" or exact_match:
+            return [
+                (index.term_coverage(doc_id, query), payload)
+                for doc_id, _, payload in sparse_hits[:top_k]
+            ]
+        
+        payloads = {doc_id: payload for doc_id, _, payload in sparse_hits}
+        rankings = [[doc_id for doc_id, _, _ in sparse_hits]]
+        dense_scores: Dict[str, float] = {}
+        
+        dense_hits = self.client.query_points(
+            collection_name=self.collections[collection],
+            query=query_vector or self.embed_query(query),
+            limit=candidates,
+            query_filter=query_filter
+        ).points
+        for hit in dense_hits:
+            payloads.setdefault(str(hit.id), hit.payload)
+            dense_scores[str(hit.id)] = hit.score
+        rankings.append([str(hit.id) for hit in dense_hits])
+        
+        fused = [doc_id for doc_id, _ in reciprocal_rank_fusion(rankings)[:top_k]]
+        missing = [doc_id for doc_id in fused if doc_id not in dense_scores]
+        if missing:
+            dense_scores.update(self._dense_scores(collection, query, query_vector, missing))
+        return [(dense_scores.get(doc_id, 0.0), payloads[doc_id]) for doc_id in fused]
+    
+    def _dense_scores(
+        self,
+        collection: str,
+        query: str,
+        query_vector: Optional[List[float]],
+        doc_ids: List[str]
+    ) -> Dict[str, float]:
+        """Cosine similarity between the query and specific points of a collection"""
+        results = self.client.query_points(
+            collection_name=self.collections[collection],
+            query=query_vector or self.embed_query(query),
+            limit=len(doc_ids),
+            query_filter=Filter(must=[HasIdCondition(has_id=doc_ids)])
+        ).points
+        return {str(hit.id): hit.score for hit in results}
+        
     def search_financial_advice(
         self,
         query: str,
         language: str = "en",
         category: Optional[str] = None,
-        top_k: int = 3
+        top_k: int = 3,
+        query_vector: Optional[List[float]] = None,
+        mode: str = RETRIEVAL_MODE
     ) -> List[Dict]:
         """
         Retrieve relevant financial advice from knowledge base
+        Uses hybrid BM25 + dense ranking by default (see `_ranked_hits`)
         """
         # Filter by language
         filter_conditions = Filter(
@@ -180,6 +668,7 @@ class FinancialMemoryRAG:
                 )
             ]
         )
+        where = {"language": language}
         
         if category:
             filter_conditions.must.append(
@@ -188,40 +677,41 @@ class FinancialMemoryRAG:
                     match=MatchValue(value=category)
                 )
             )
+            where["category"] = category
         
-        results = self.client.query(
-            collection_name=self.collections["financial_advice"],
-            query_text=query,
-            limit=top_k,
-            query_filter=filter_conditions
+        results = self._ranked_hits(
+            "financial_advice", query, top_k, query_vector, filter_conditions, where, mode
         )
         
         return [
             {
-                "score": hit.score,
-                "question": hit.payload["question"],
-                "answer": hit.payload["answer"],
-                "category": hit.payload["category"]
+                "score": score,
+                "question": payload["question"],
+                "answer": payload["answer"],
+                "category": payload["category"]
             }
-            for hit in results
+            for score, payload in results
         ]
         
-    def search_regulations(self, query: str, top_k: int = 3) -> List[Dict]:
+    def search_regulations(
+        self,
+        query: str,
+        top_k: int = 3,
+        query_vector: Optional[List[float]] = None,
+        mode: str = RETRIEVAL_MODE
+    ) -> List[Dict]:
         """
         Search Indian financial regulations
+        Uses hybrid BM25 + dense ranking by default (see `_ranked_hits`)
         """
-        results = self.client.query(
-            collection_name=self.collections["regulatory_info"],
-            query_text=query,
-            limit=top_k
-        )
+        results = self._ranked_hits("regulatory_info", query, top_k, query_vector, mode=mode)
         
         return [
             {
-                "score": hit.score,
-                **hit.payload
+                "score": score,
+                **self._public_payload(payload)
             }
-            for hit in results
+            for score, payload in results
         ]
         
     def get_personalized_recommendations(
@@ -233,9 +723,10 @@ class FinancialMemoryRAG:
         Generate personalized financial recommendations using RAG
         Combines loan products, advice, and regulations
         """
-        # Search relevant knowledge
-        loan_products = self.search_loan_products(user_query, user_profile, top_k=3)
-        financial_advice = self.search_financial_advice(user_query, top_k=2)
+        # Search relevant knowledge with a single query embedding
+        query_vector = self.embed_query(user_query)
+        loan_products = self.search_loan_products(user_query, user_profile, top_k=3, query_vector=query_vector)
+        financial_advice = self.search_financial_advice(user_query, top_k=2, query_vector=query_vector)
         
         return {
             "recommended_products": loan_products,
@@ -0,0 +1,168 @@
+"""
+Semantic Response Cache for the RAG advisor
+Near-identical questions (cosine similarity above a threshold) from users in
+the same language and coarse profile bucket reuse a previous answer instead
+of calling the LLM again
+"""
+
+import os
+import time
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+
+RAG_CACHE_THRESHOLD = float(os.getenv("RAG_CACHE_THRESHOLD", "0.95"))
+RAG_CACHE_TTL_SECONDS = float(os.getenv("RAG_CACHE_TTL_SECONDS", "3600"))
+RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "1000"))
+
+# Band edges for the profile figures a cacheable prompt may show: rupee
+# amounts (income, expenses, savings) and the 0-100 health score, whose edges
+# match the health score's own thresholds
+AMOUNT_BANDS = (0, 5000, 10000, 15000, 20000, 25000, 35000, 50000, 75000, 100000)
+HEALTH_SCORE_BANDS = (50, 70)
+
+# Profile figures shown in the prompt: label -> (camelCase key, snake_case key)
+PROFILE_FIGURES = {
+    "Monthly Income": ("monthlyIncome", "monthly_income"),
+    "Monthly Expenses": ("monthlyExpenses", "monthly_expenses"),
+    "Monthly Savings": ("monthlySavings", "monthly_savings")
+}
+
+
+def _band(value: Any, edges: tuple, unit: str = "") -> str:
+    """Range label for `value`, e.g. "₹15,000-20,000"; "Not provided" if it is not a number"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return "Not provided"
+    index = sum(1 for edge in edges if value >= edge)
+    if index == 0:
+        return f"below {unit}{edges[0]:,}"
+    if index == len(edges):
+        return f"{unit}{edges[-1]:,}+"
+    return f"{unit}{edges[index - 1]:,}-{edges[index]:,}"
+
+
+def profile_bands(user_profile: Optional[Dict]) -> Dict[str, str]:
+    """
+    Profile figures as ranges; prompts of cacheable requests show only these,
+    so every user sharing a cached answer would have received the same prompt
+    """
+    user_profile = user_profile or {}
+    bands = {}
+    for label, keys in PROFILE_FIGURES.items():
+        value = next((user_profile[key] for key in keys if user_profile.get(key) not in (None, "")), None)
+        bands[label] = _band(value, AMOUNT_BANDS, "₹")
+    health = _band(user_profile.get("healthScore", user_profile.get("health_score")), HEALTH_SCORE_BANDS)
+    bands["Financial Health Score"] = health if health == "Not provided" else f"{health} (out of 100)"
+    return bands
+
+
+def profile_bucket(user_profile: Optional[Dict], eligible_products: Iterable[str] = ()) -> str:
+    """
+    Order-insensitive summary of everything a profile contributes to a
+    cacheable prompt: the loan products it is eligible for (retrieval filters
+    on them) and its banded figures
+    """
+    if not user_profile:
+        return "anonymous"
+    bands = "|".join(f"{label}:{band}" for label, band in profile_bands(user_profile).items())
+    return f"eligible:{','.join(sorted(eligible_products))}|{bands}"
+
+
+class SemanticResponseCache:
+    """
+    Cache of (query vector, scope) -> response with cosine-similarity lookup
+    - `scope` partitions entries (e.g. language and profile bucket)
+    - Entries expire after `ttl_seconds`; the least recently used entry is
+      evicted once `maxsize` is reached
+    - Everything is dropped when the knowledge-base version changes
+    """
+    
+    def __init__(
+        self,
+        threshold: float = RAG_CACHE_THRESHOLD,
+        ttl_seconds: float = RAG_CACHE_TTL_SECONDS,
+        maxsize: int = RAG_CACHE_SIZE
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # entry id -> (scope, unit vector, value, expires_at)
+        self._scopes: Dict[Hashable, List[int]] = {}
+        self._matrices: Dict[Hashable, np.ndarray] = {}
+        self._ids = count()
+        self._kb_version = None
+        self._lock = Lock()
+    
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _sync_version(self, kb_version: Hashable):
+        if kb_version != self._kb_version:
+            self._entries.clear()
+            self._scopes.clear()
+            self._matrices.clear()
+            self._kb_version = kb_version
+    
+    def _remove(self, entry_id: int):
+        scope = self._entries.pop(entry_id)[0]
+        self._scopes[scope].remove(entry_id)
+        self._matrices.pop(scope, None)
+        if not self._scopes[scope]:
+            del self._scopes[scope]
+    
+    def lookup(self, vector, scope: Hashable, kb_version: Hashable) -> Optional[Any]:
+        """Return the cached value for the most similar live entry in `scope`, if similar enough"""
+        query = self._unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            self._sync_version(kb_version)
+            
+            for entry_id in [i for i in self._scopes.get(scope, []) if self._entries[i][3] <= now]:
+                self._remove(entry_id)
+            
+            entry_ids = self._scopes.get(scope)
+            if not entry_ids:
+                self.misses += 1
+                return None
+            
+            matrix = self._matrices.get(scope)
+            if matrix is None:
+                matrix = np.stack([self._entries[i][1] for i in entry_ids])
+                self._matrices[scope] = matrix
+            
+            similarities = matrix @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            
+            entry_id = entry_ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return self._entries[entry_id][2]
+    
+    def store(self, vector, scope: Hashable, kb_version: Hashable, value: Any):
+        """Cache a value for the query vector within `scope`"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._sync_version(kb_version)
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (scope, self._unit(vector), value, time.monotonic() + self.ttl_seconds)
+            self._scopes.setdefault(scope, []).append(entry_id)
+            self._matrices.pop(scope, None)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+    
+    def stats(self) -> Dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,254 @@
+"""
+Running Analytics for live dashboards
+Totals, category spending, rolling 30/90-day windows and the health score are
+updated in O(1) per new transaction instead of re-scanning the user's history
+"""
+
+import os
+from datetime import date
+from threading import Lock
+from typing import Dict, Iterable, Optional
+
+from app.models.schemas import AnalyticsSummary, HealthScore
+from app.services.transaction_store import CREDIT, EPOCH, TransactionStore, parse_date_days
+
+ROLLING_WINDOWS = (30, 90)
+# Fold day buckets outside every window away after this many new transactions
+ANALYTICS_COMPACT_EVERY = int(os.getenv("ANALYTICS_COMPACT_EVERY", "1000"))
+
+
+def today_days() -> int:
+    return (date.today() - EPOCH).days
+
+
+def compute_health_score(income: float, expenses: float) -> HealthScore:
+    """Savings rate as a 0-100 score (same scale as the dashboard)"""
+    score = max(0.0, min(100.0, (income - expenses) / income * 100)) if income > 0 else 0.0
+    if score >= 70:
+        narrative = f"Excellent: you save {score:.0f}% of your income."
+        suggestion = "Consider investing surplus savings or building a 6-month emergency fund."
+    elif score >= 50:
+        narrative = f"Good: you save {score:.0f}% of your income."
+        suggestion = "Review your largest spending categories to push savings above 70%."
+    elif income > 0:
+        narrative = f"Needs attention: you save {score:.0f}% of your income."
+        suggestion = "Cut discretionary spending and avoid new loans until savings improve."
+    else:
+        narrative = "No income recorded yet."
+        suggestion = "Import your bank SMS so income can be tracked."
+    return HealthScore(score=round(score, 1), narrative=narrative, suggestion=suggestion)
+
+
+class RunningAnalytics:
+    """
+    Incrementally maintained aggregates for one user
+
+    Rolling windows end at `as_of` (the latest transaction day or today,
+    whichever is later). Moving `as_of` forward subtracts the day buckets that
+    leave each window, so every day is added and removed once
+    """
+
+    def __init__(self, windows=ROLLING_WINDOWS, compact_every: int = ANALYTICS_COMPACT_EVERY):
+        self.windows = tuple(windows)
+        self.horizon = max(self.windows)
+        self.compact_every = compact_every
+        self._lock = Lock()
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.income = 0.0
+        self.expenses = 0.0
+        self.categories: Dict[str, float] = {}
+        # day -> [income, expenses] for days still inside the largest window
+        self.days: Dict[int, list] = {}
+        self.window_totals = {window: [0.0, 0.0] for window in self.windows}
+        self.as_of: Optional[int] = None
+        self._since_compaction = 0
+
+    def _advance(self, day: int):
+        """Move the windows' end to `day`, dropping buckets that fall out"""
+        if self.as_of is None:
+            self.as_of = day
+            return
+        if day <= self.as_of:
+            return
+        for window, totals in self.window_totals.items():
+            # Days in (as_of - window, day - window] leave this window; none
+            # of them is later than the old as_of, so at most `window` lookups
+            for expired in range(self.as_of - window + 1, min(self.as_of, day - window) + 1):
+                bucket = self.days.get(expired)
+                if bucket is not None:
+                    totals[0] -= bucket[0]
+                    totals[1] -= bucket[1]
+        self.as_of = day
+
+    def record(self, transaction: Dict):
+        """Add one transaction (SMSParser / Transaction shape)"""
+        with self._lock:
+            self._record(transaction)
+            self._maybe_compact()
+
+    def record_many(self, transactions: Iterable[Dict]):
+        with self._lock:
+            for transaction in transactions:
+                self._record(transaction)
+            self._maybe_compact()
+
+    def _record(self, transaction: Dict):
+        amount = float(transaction["amount"])
+        credit = transaction.get("type") == "credit"
+        day = parse_date_days(transaction.get("date") or "")
+
+        self.count += 1
+        if credit:
+            self.income += amount
+        else:
+            self.expenses += amount
+            category = transaction.get("category") or "Others"
+            self.categories[category] = self.categories.get(category, 0.0) + amount
+
+        self._advance(day)
+        column = 0 if credit else 1
+        if day > self.as_of - self.horizon:
+            bucket = self.days.setdefault(day, [0.0, 0.0])
+            bucket[column] += amount
+        for window, totals in self.window_totals.items():
+            if day > self.as_of - window:
+                totals[column] += amount
+        self._since_compaction += 1
+
+    def _maybe_compact(self):
+        if self._since_compaction >= self.compact_every:
+            self._compact()
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        """
+        Drop day buckets outside every window and re-sum the window totals
+        from the remaining buckets (clears floating-point drift)
+        """
+        if self.as_of is not None:
+            cutoff = self.as_of - self.horizon
+            self.days = {day: bucket for day, bucket in self.days.items() if day > cutoff}
+            for window, totals in self.window_totals.items():
+                start = self.as_of - window
+                totals[0] = sum(bucket[0] for day, bucket in self.days.items() if day > start)
+                totals[1] = sum(bucket[1] for day, bucket in self.days.items() if day > start)
+        self._since_compaction = 0
+
+    def rebuild(self, store: TransactionStore):
+        """Recompute every aggregate from the user's full columnar history"""
+        columns = store.columns()
+        with self._lock:
+            self._reset()
+            count = len(columns["amount"])
+            if not count:
+                return
+            credit = columns["type"] == CREDIT
+            amounts = columns["amount"]
+            days = columns["day"]
+
+            self.count = count
+            self.income = float(amounts[credit].sum())
+            self.expenses = float(amounts[~credit].sum())
+            self.categories = store.summary().categories
+            self.as_of = int(days.max())
+
+            recent = days > self.as_of - self.horizon
+            for day, is_credit, amount in zip(days[recent], credit[recent], amounts[recent]):
+                bucket = self.days.setdefault(int(day), [0.0, 0.0])
+                bucket[0 if is_credit else 1] += float(amount)
+            for window, totals in self.window_totals.items():
+                inside = days > self.as_of - window
+                totals[0] = float(amounts[inside & credit].sum())
+                totals[1] = float(amounts[inside & ~credit].sum())
+
+    def summary(self) -> AnalyticsSummary:
+        with self._lock:
+            return AnalyticsSummary(
+                income=round(self.income, 2),
+                expenses=round(self.expenses, 2),
+                balance=round(self.income - self.expenses, 2),
+                categories={name: round(total, 2) for name, total in self.categories.items() if total}
+            )
+
+    def health_score(self) -> HealthScore:
+        with self._lock:
+            return compute_health_score(self.income, self.expenses)
+
+    def snapshot(self, as_of: Optional[int] = None) -> Dict:
+        """
+        Dashboard view: totals, rolling windows ending today (or `as_of`) and health score
+        """
+        with self._lock:
+            self._advance(as_of if as_of is not None else today_days())
+            return {
+                "count": self.count,
+                "as_of": str(date.fromordinal(EPOCH.toordinal() + self.as_of)),
+                "income": round(self.income, 2),
+                "expenses": round(self.expenses, 2),
+                "balance": round(self.income - self.expenses, 2),
+                "categories": {name: round(total, 2) for name, total in self.categories.items() if total},
+                "windows": {
+                    f"{window}d": {
+                        "income": round(totals[0], 2),
+                        "expenses": round(totals[1], 2),
+                        "balance": round(totals[0] - totals[1], 2)
+                    }
+                    for window, totals in self.window_totals.items()
+                },
+                "health_score": compute_health_score(self.income, self.expenses).model_dump()
+            }
+
+    def verify(self, store: TransactionStore, tolerance: float = 0.01) -> Dict:
+        """
+        Compare the running aggregates with a from-scratch rebuild over `store`
+
+        Returns:
+            Dict with `consistent` and the mismatching fields (running vs rebuilt)
+        """
+        rebuilt = RunningAnalytics(self.windows, self.compact_every)
+        rebuilt.rebuild(store)
+        with self._lock:
+            as_of = self.as_of
+        if as_of is not None:
+            rebuilt._advance(as_of)
+
+        current, expected = self.snapshot(as_of), rebuilt.snapshot(as_of)
+        mismatches = {}
+        for field in ("count", "income", "expenses"):
+            if abs(current[field] - expected[field]) > tolerance:
+                mismatches[field] = (current[field], expected[field])
+        for name in set(current["categories"]) | set(expected["categories"]):
+            running, full = current["categories"].get(name, 0.0), expected["categories"].get(name, 0.0)
+            if abs(running - full) > tolerance:
+                mismatches[f"categories.{name}"] = (running, full)
+        for window in current["windows"]:
+            for field in ("income", "expenses"):
+                running, full = current["windows"][window][field], expected["windows"][window][field]
+                if abs(running - full) > tolerance:
+                    mismatches[f"windows.{window}.{field}"] = (running, full)
+        return {"consistent": not mismatches, "mismatches": mismatches}
+
+
+class RunningAnalyticsRegistry:
+    """One RunningAnalytics per user, created on first use"""
+
+    def __init__(self):
+        self._users: Dict[str, RunningAnalytics] = {}
+        self._lock = Lock()
+
+    def get(self, user_id: str) -> RunningAnalytics:
+        analytics = self._users.get(user_id)
+        if analytics is None:
+            with self._lock:
+                analytics = self._users.setdefault(user_id, RunningAnalytics())
+        return analytics
+
+
+# Singleton instance
+running_analytics = RunningAnalyticsRegistry()
@@ -0,0 +1,47 @@
+"""
+Request coalescing ("single-flight") for identical concurrent requests
+While a call for a key is in progress, later callers with the same key await
+the same result instead of starting their own; nothing is kept once it
+finishes, so results are never stale
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicate concurrent async calls by key"""
+    
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+    
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await the in-flight call for `key`, or start one with `factory()`
+        
+        The shared call runs as its own task and is shielded, so a caller
+        that disconnects does not cancel it for everyone else.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved in case every waiter went away
+        if not task.cancelled():
+            task.exception()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._in_flight), "calls": self.calls, "coalesced": self.coalesced}
@@ -0,0 +1,169 @@
+"""
+Bulk SMS Parsing for onboarding backfills
+Splits an export into line-aligned chunks, parses them across a process pool
+and merges the results in original order as a background job with progress
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.cache import LRUCache
+from app.services.sms_parser import SMSParser
+
+# Worker processes (default: one per core) and characters per chunk
+SMS_BULK_WORKERS = int(os.getenv("SMS_BULK_WORKERS", "0")) or os.cpu_count() or 1
+SMS_BULK_CHUNK_CHARS = int(os.getenv("SMS_BULK_CHUNK_CHARS", str(256 * 1024)))
+# Finished jobs are kept for polling this long (and at most this many)
+SMS_BULK_MAX_JOBS = int(os.getenv("SMS_BULK_MAX_JOBS", "100"))
+SMS_BULK_JOB_TTL_SECONDS = float(os.getenv("SMS_BULK_JOB_TTL_SECONDS", "3600"))
+
+# One parser per worker process, built by the pool initializer
+_worker_parser: Optional[SMSParser] = None
+
+
+def _init_worker():
+    global _worker_parser
+    _worker_parser = SMSParser()
+
+
+def _parse_chunk(chunk: str) -> List[Dict]:
+    """Runs in a worker process"""
+    return list(_worker_parser.iter_parse(chunk))
+
+
+def iter_chunks(text: str, chunk_chars: int = SMS_BULK_CHUNK_CHARS) -> Iterator[Tuple[int, int]]:
+    """(start, end) offsets of line-aligned chunks of roughly `chunk_chars` characters"""
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start + chunk_chars)
+        end = len(text) if end == -1 else end + 1
+        yield start, end
+        start = end
+
+
+class BulkParseJob:
+    """State of one bulk parse, polled by the client"""
+
+    def __init__(self, total_chars: int):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.total_chars = total_chars
+        self.processed_chars = 0
+        self.transactions: List[Dict] = []
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        return round(self.processed_chars / self.total_chars, 4) if self.total_chars else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "transaction_count": len(self.transactions),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class BulkParseManager:
+    """
+    Runs bulk parse jobs on a shared process pool
+
+    Jobs live in this API process; with several server workers a client must
+    poll the worker that accepted the job (or use a single import worker)
+    """
+
+    def __init__(
+        self,
+        workers: int = SMS_BULK_WORKERS,
+        chunk_chars: int = SMS_BULK_CHUNK_CHARS,
+        max_jobs: int = SMS_BULK_MAX_JOBS,
+        job_ttl: float = SMS_BULK_JOB_TTL_SECONDS
+    ):
+        self.workers = workers
+        self.chunk_chars = chunk_chars
+        # Queued/running jobs are never evicted; finished ones move to the LRU
+        self._running: Dict[str, BulkParseJob] = {}
+        self.jobs = LRUCache(max_jobs, ttl=job_ttl)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the pool on first use; spawn avoids forking the threaded API process"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def submit(self, text: str) -> BulkParseJob:
+        """Start parsing `text` in the background and return its job"""
+        job = BulkParseJob(len(text))
+        self._running[job.id] = job
+        task = asyncio.create_task(self._run(job, text))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkParseJob]:
+        return self._running.get(job_id) or self.jobs.get(job_id)
+
+    async def _run(self, job: BulkParseJob, text: str):
+        loop = asyncio.get_running_loop()
+        job.status = "running"
+        chunks = list(iter_chunks(text, self.chunk_chars))
+        results: List[Optional[List[Dict]]] = [None] * len(chunks)
+
+        # Keep roughly two chunks per worker in flight so pickled input stays bounded
+        semaphore = asyncio.Semaphore(self.workers * 2)
+
+        async def parse(index: int, start: int, end: int):
+            async with semaphore:
+                results[index] = await loop.run_in_executor(
+                    self._get_executor(), _parse_chunk, text[start:end]
+                )
+            job.processed_chars += end - start
+
+        try:
+            await asyncio.gather(*(parse(i, start, end) for i, (start, end) in enumerate(chunks)))
+            for chunk_results in results:
+                job.transactions.extend(chunk_results)
+            job.status = "completed"
+            print(f"✅ Bulk SMS job {job.id}: {len(job.transactions)} transactions from {len(chunks)} chunks")
+        except BrokenProcessPool as e:
+            self._executor = None
+            job.status = "failed"
+            job.error = f"Worker pool crashed: {e}"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self.jobs.set(job.id, job)
+            self._running.pop(job.id, None)
+            if job.status == "failed":
+                print(f"❌ Bulk SMS job {job.id} failed: {job.error}")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+bulk_parser = BulkParseManager()
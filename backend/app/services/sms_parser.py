@@ -1,65 +1,303 @@
+import codecs
+import os
 import re
 from datetime import datetime
-from typing import List, Dict
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+
+# Longest line kept when reading streams; the rest of an oversized line is skipped
+SMS_MAX_LINE_LENGTH = int(os.getenv("SMS_MAX_LINE_LENGTH", "4096"))
+
+# Category rules in priority order (first matching category wins)
+CATEGORY_RULES = [
+    ('Income', ('salary', 'income', 'credited', 'neft', 'rtgs', 'imps')),
+    ('Food', ('swiggy', 'zomato', 'restaurant', 'cafe', 'food')),
+    ('Travel', ('uber', 'ola', 'metro', 'irctc', 'travel', 'ticket')),
+    ('Transport', ('fuel', 'petrol', 'diesel', 'hp', 'iocl')),
+    ('Shopping', ('amazon', 'flipkart', 'shopping')),
+    ('Bills', ('bill', 'electricity', 'water', 'rent')),
+]
+CREDIT_KEYWORDS = ('credited', 'received', 'deposit', 'salary', 'refund')
+UPI_KEYWORDS = ('upi', 'gpay', 'phonepe', 'paytm')
+MERCHANTS = ('swiggy', 'zomato', 'uber', 'ola', 'amazon', 'flipkart', 'irctc', 'metro',
+             'fuel', 'hp', 'iocl', 'cafe', 'restaurant', 'hotel', 'movie')
+
+# Lines that mention UPI but match no other rule
+UPI_CATEGORY = 'UPI'
+DEFAULT_CATEGORY = 'Others'
+
+
+def _build_keyword_facts() -> Dict[str, Dict]:
+    """
+    What each keyword says about a line: category rank, credit direction,
+    UPI mention and merchant name length. Keywords are matched as substrings,
+    so a keyword also carries the facts of every keyword that is its prefix
+    (both start at the same position, but the scanner reports only one)
+    """
+    facts = {}
+
+    def entry(keyword):
+        return facts.setdefault(keyword, {'rank': None, 'credit': False, 'upi': False, 'merchant_length': None})
+
+    for rank, (_, keywords) in enumerate(CATEGORY_RULES):
+        for keyword in keywords:
+            current = entry(keyword)['rank']
+            entry(keyword)['rank'] = rank if current is None else min(current, rank)
+    for keyword in CREDIT_KEYWORDS:
+        entry(keyword)['credit'] = True
+    for keyword in UPI_KEYWORDS:
+        entry(keyword)['upi'] = True
+    for keyword in MERCHANTS:
+        entry(keyword)['merchant_length'] = len(keyword)
+
+    merged = {}
+    for keyword in facts:
+        prefixes = [facts[other] for other in facts if keyword.startswith(other)]
+        ranks = [fact['rank'] for fact in prefixes if fact['rank'] is not None]
+        merchant_lengths = [fact['merchant_length'] for fact in prefixes if fact['merchant_length']]
+        merged[keyword] = {
+            'rank': min(ranks) if ranks else None,
+            'credit': any(fact['credit'] for fact in prefixes),
+            'upi': any(fact['upi'] for fact in prefixes),
+            # Shortest name, as a merchant alternation would have matched it first
+            'merchant_length': min(merchant_lengths) if merchant_lengths else None,
+        }
+    return merged
+
+
+KEYWORD_FACTS = _build_keyword_facts()
+AMOUNT_PREFIXES = ('inr', 'rs', '₹')
+# Labels that introduce a bank reference number (UPI Ref No, UTR, RRN, Txn ID)
+REFERENCE_PREFIXES = ('ref', 'utr', 'rrn', 'txn')
+
+
+def _resume_offset(keyword: str) -> int:
+    """
+    First offset inside `keyword` where another amount, reference or keyword
+    could start (e.g. "petrol" in "hpetrol"); the scan resumes there instead of
+    after the match
+    """
+    tokens = (*KEYWORD_FACTS, *AMOUNT_PREFIXES, *REFERENCE_PREFIXES)
+    for offset in range(1, len(keyword)):
+        rest = keyword[offset:]
+        if any(token.startswith(rest) or rest.startswith(token) for token in tokens):
+            return offset
+    return len(keyword)
+
+
+# One alternation for amounts, dates, every keyword and reference numbers,
+# matched against the lowercased line. References come last so a keyword that
+# starts at the same position ("refund") still wins. Lines whose lowercase form changes length fall back to the
+# case-insensitive variant so match offsets stay valid for the original text
+_SCANNER_PATTERN = (
+    r'(?P<amount>(?:inr|rs\.?|₹)\s*(?P<number>[0-9,]+\.?[0-9]*))'
+    r'|(?P<date>\d{2}[/-]\d{2}[/-]\d{2,4}|\d{4}-\d{2}-\d{2})'
+    r'|(?P<keyword>' + '|'.join(
+        re.escape(keyword) for keyword in sorted(KEYWORD_FACTS, key=len, reverse=True)
+    ) + r')'
+    r'|(?P<reference>(?:ref(?:erence)?|utr|rrn|txn)(?:\s*(?:no|id|number))?\.?\s*[:#-]?\s*'
+    r'(?P<reference_number>(?=[a-z]*[0-9])[a-z0-9]{6,}))'
+)
+SMS_SCANNER = re.compile(_SCANNER_PATTERN)
+SMS_SCANNER_IGNORECASE = re.compile(_SCANNER_PATTERN, re.IGNORECASE)
+RESUME_OFFSETS = {keyword: _resume_offset(keyword) for keyword in KEYWORD_FACTS}
+
 
 class SMSParser:
     def __init__(self):
-        self.amount_regex = re.compile(r'(INR|Rs\.?|₹)\s*([0-9,]+\.?[0-9]*)', re.IGNORECASE)
-        self.debit_regex = re.compile(r'(debited|spent|withdrawn|paid)', re.IGNORECASE)
-        self.credit_regex = re.compile(r'(credited|received|deposit|salary|refund)', re.IGNORECASE)
-        self.upi_regex = re.compile(r'(UPI|GPay|PhonePe|Paytm)', re.IGNORECASE)
-        self.merchant_regex = re.compile(r'(Swiggy|Zomato|Uber|Ola|Amazon|Flipkart|IRCTC|Metro|Fuel|HP|IOCL|Cafe|Restaurant|Hotel|Movie)', re.IGNORECASE)
-        self.date_regex = re.compile(r'(\d{2}[/-]\d{2}[/-]\d{2,4}|\d{4}-\d{2}-\d{2})')
+        self.scanner = SMS_SCANNER
+        self.scanner_ignorecase = SMS_SCANNER_IGNORECASE
+        self.keyword_facts = KEYWORD_FACTS
+        self.resume_offsets = RESUME_OFFSETS
 
-    def categorize(self, text: str) -> str:
-        text_lower = text.lower()
-        if re.search(r'salary|income|credited|neft|rtgs|imps', text_lower):
-            return 'Income'
-        elif re.search(r'swiggy|zomato|restaurant|cafe|food', text_lower):
-            return 'Food'
-        elif re.search(r'uber|ola|metro|irctc|travel|ticket', text_lower):
-            return 'Travel'
-        elif re.search(r'fuel|petrol|diesel|hp|iocl', text_lower):
-            return 'Transport'
-        elif re.search(r'amazon|flipkart|shopping', text_lower):
-            return 'Shopping'
-        elif re.search(r'bill|electricity|water|rent', text_lower):
-            return 'Bills'
-        elif self.upi_regex.search(text):
-            return 'UPI'
+    def scan_line(self, line: str) -> Dict:
+        """
+        Amount, date, direction, merchant and category of one line in a single
+        left-to-right scan. Every position where an amount, date or keyword
+        starts is visited, including overlapping ones, which gives the same
+        result as searching for each of them separately
+        """
+        amount = date = merchant = reference = None
+        rank = None
+        credit = upi = False
+
+        text = line.lower()
+        search = self.scanner.search
+        if len(text) != len(line):
+            text = line
+            search = self.scanner_ignorecase.search
+
+        match = search(text)
+        while match is not None:
+            kind = match.lastgroup
+            resume = match.end()
+            if kind == 'amount':
+                if amount is None:
+                    amount = match.group('number')
+                if date is None:
+                    # A date may start inside the amount's digits
+                    resume = match.start() + 1
+            elif kind == 'date':
+                if date is None:
+                    date = match.group('date')
+            elif kind == 'reference':
+                if reference is None:
+                    reference = match.group('reference_number').lower()
+                # Amounts, dates or keywords may start inside the reference
+                resume = match.start() + 1
+            else:
+                key = match.group('keyword').lower()
+                resume = match.start() + self.resume_offsets.get(key, 1)
+                facts = self.keyword_facts.get(key)
+                if facts is not None:
+                    if facts['rank'] is not None and (rank is None or facts['rank'] < rank):
+                        rank = facts['rank']
+                    credit = credit or facts['credit']
+                    upi = upi or facts['upi']
+                    if merchant is None and facts['merchant_length']:
+                        start = match.start()
+                        merchant = line[start:start + facts['merchant_length']]
+            match = search(text, resume)
+
+        if rank is not None:
+            category = CATEGORY_RULES[rank][0]
         else:
-            return 'Others'
+            category = UPI_CATEGORY if upi else DEFAULT_CATEGORY
 
-    def parse_sms(self, sms_text: str) -> List[Dict]:
-        lines = [line.strip() for line in sms_text.split('\n') if line.strip()]
-        transactions = []
+        return {
+            'amount': amount,
+            'credit': credit,
+            'upi': upi,
+            'merchant': merchant,
+            'category': category,
+            'date': date,
+            'reference': reference
+        }
 
+    def categorize(self, text: str) -> str:
+        return self.scan_line(text)['category']
+
+    def parse_line(self, line: str) -> Optional[Dict]:
+        """
+        Transaction described by one SMS line, or None if it has no amount
+        (or the amount does not parse, e.g. "Rs, ..."), so one malformed
+        message never aborts an import
+        """
+        line = line.strip()
+        if not line:
+            return None
+
+        scan = self.scan_line(line)
+        if scan['amount'] is None:
+            return None
+
+        try:
+            amount = float(scan['amount'].replace(',', ''))
+        except ValueError:
+            return None
+
+        tx_type = 'credit' if scan['credit'] else 'debit'
+
+        merchant = scan['merchant'] or ('UPI' if scan['upi'] else 'Payment')
+
+        date = scan['date'] or datetime.now().strftime('%Y-%m-%d')
+
+        return {
+            'amount': amount,
+            'type': tx_type,
+            'merchant': merchant,
+            'category': scan['category'],
+            'date': date,
+            # True when the SMS has no date and today's date was filled in
+            'date_inferred': scan['date'] is None,
+            'reference': scan['reference'],
+            'raw_sms': line
+        }
+
+    @staticmethod
+    def _iter_lines(text: str) -> Iterator[str]:
+        """Lines of an in-memory export without building a list of them"""
+        start = 0
+        while start <= len(text):
+            end = text.find('\n', start)
+            if end == -1:
+                end = len(text)
+            yield text[start:end]
+            start = end + 1
+
+    def iter_parse(self, stream: Union[str, Iterable[str], Iterable[bytes]], deduper=None) -> Iterator[Dict]:
+        """
+        Yield transactions one line at a time
+
+        Args:
+            stream: Export text, a text or binary file object, or any iterable of lines
+            deduper: Optional DedupBatch; already-seen transactions are skipped
+
+        Returns:
+            Generator of transaction dicts (same shape as parse_sms)
+        """
+        lines = self._iter_lines(stream) if isinstance(stream, str) else stream
         for line in lines:
-            amount_match = self.amount_regex.search(line)
-            if not amount_match:
-                continue
-
-            amount = float(amount_match.group(2).replace(',', ''))
-            
-            tx_type = 'credit' if self.credit_regex.search(line) else 'debit'
-            
-            merchant_match = self.merchant_regex.search(line)
-            merchant = merchant_match.group(1) if merchant_match else (
-                'UPI' if self.upi_regex.search(line) else 'Payment'
-            )
-            
-            category = self.categorize(line)
-            
-            date_match = self.date_regex.search(line)
-            date = date_match.group(0) if date_match else datetime.now().strftime('%Y-%m-%d')
-            
-            transactions.append({
-                'amount': amount,
-                'type': tx_type,
-                'merchant': merchant,
-                'category': category,
-                'date': date,
-                'raw_sms': line
-            })
-
-        return transactions
+            if isinstance(line, (bytes, bytearray)):
+                line = line.decode('utf-8', errors='replace')
+            transaction = self.parse_line(line)
+            if transaction is not None and (deduper is None or deduper.add(transaction)):
+                yield transaction
+
+    async def aiter_parse(
+        self,
+        chunks: AsyncIterable[Union[bytes, str]],
+        max_line_length: int = SMS_MAX_LINE_LENGTH,
+        deduper=None
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield transactions from an async byte stream (e.g. an upload body) as it
+        arrives; only the current partial line is buffered
+
+        Args:
+            chunks: Async iterable of UTF-8 bytes (or str) chunks of any size
+            max_line_length: Longer lines are cut to this many characters
+            deduper: Optional DedupBatch; already-seen transactions are skipped
+
+        Returns:
+            Async generator of transaction dicts
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        pending = ''
+        # Inside the skipped remainder of an oversized line
+        overflow = False
+
+        def parse(line: str) -> Optional[Dict]:
+            transaction = self.parse_line(line)
+            if transaction is not None and deduper is not None and not deduper.add(transaction):
+                return None
+            return transaction
+
+        def complete_lines(text: str, final: bool = False) -> List[Optional[Dict]]:
+            nonlocal pending, overflow
+            parts = (pending + text).split('\n')
+            pending = '' if final else parts.pop()
+            results = []
+            for part in parts:
+                if overflow:
+                    overflow = False
+                    continue
+                results.append(parse(part))
+            if len(pending) > max_line_length:
+                if not overflow:
+                    results.append(parse(pending[:max_line_length]))
+                    overflow = True
+                pending = ''
+            return results
+
+        async for chunk in chunks:
+            text = decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+            for transaction in complete_lines(text):
+                if transaction is not None:
+                    yield transaction
+
+        for transaction in complete_lines(decoder.decode(b'', final=True), final=True):
+            if transaction is not None:
+                yield transaction
+
+    def parse_sms(self, sms_text: str) -> List[Dict]:
+        return list(self.iter_parse(sms_text))
@@ -0,0 +1,158 @@
+"""
+In-process BM25 Inverted Index for lexical retrieval
+Complements dense MiniLM search for exact terms ("ITR-4", "80C", "CIBIL")
+and Devanagari/Kannada text
+"""
+
+import math
+import re
+from collections import Counter
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+# Word characters plus the Devanagari and Kannada blocks, so vowel signs and
+# viramas (which `\w` does not match) stay inside their word; the Devanagari
+# danda punctuation (U+0964/U+0965) is excluded
+_WORD = r"[\w\u0900-\u0963\u0966-\u097F\u0C80-\u0CFF]+"
+TOKEN_REGEX = re.compile(rf"{_WORD}(?:-{_WORD})*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens; hyphenated terms are kept whole and also split,
+    so "ITR-4" yields ["itr-4", "itr", "4"]
+    """
+    tokens = []
+    for match in TOKEN_REGEX.finditer(text.lower()):
+        token = match.group(0)
+        tokens.append(token)
+        if "-" in token:
+            tokens.extend(part for part in token.split("-") if part)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an incrementally maintained inverted index
+    Documents carry their payload so hits can be returned without touching
+    the vector store
+    """
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        # Each document's distinct terms, so removal only touches its postings
+        self._doc_terms: Dict[str, frozenset] = {}
+        self._payloads: Dict[str, Dict] = {}
+        self._total_length = 0
+        self._lock = Lock()
+    
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+    
+    def add(self, doc_id: str, text: str, payload: Dict):
+        """Index a document, replacing any previous version with the same ID"""
+        term_counts = Counter(tokenize(text))
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, count in term_counts.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+            length = sum(term_counts.values())
+            self._doc_lengths[doc_id] = length
+            self._doc_terms[doc_id] = frozenset(term_counts)
+            self._payloads[doc_id] = payload
+            self._total_length += length
+    
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove_locked(doc_id)
+    
+    def _remove_locked(self, doc_id: str):
+        length = self._doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._payloads.pop(doc_id, None)
+        self._total_length -= length
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+    
+    def term_coverage(self, doc_id: str, query: str) -> float:
+        """Fraction of distinct query terms that occur in the document"""
+        terms = set(tokenize(query))
+        if not terms:
+            return 0.0
+        with self._lock:
+            matched = len(terms & self._doc_terms.get(doc_id, frozenset()))
+        return matched / len(terms)
+    
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        where: Optional[Dict] = None
+    ) -> List[Tuple[str, float, Dict]]:
+        """
+        Rank documents by BM25 score
+        
+        Args:
+            query: Free-text query
+            top_k: Maximum number of hits
+            where: Exact-match payload constraints, e.g. {"language": "hi"}
+            
+        Returns:
+            List of (doc_id, score, payload), best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count or not terms:
+                return []
+            average_length = self._total_length / doc_count
+            
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+            
+            hits = [
+                (doc_id, score, self._payloads[doc_id])
+                for doc_id, score in scores.items()
+                if not where or all(self._payloads[doc_id].get(key) == value for key, value in where.items())
+            ]
+        
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:top_k]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse several ranked ID lists with RRF
+    Scores are normalized so a document ranked first in every list gets 1.0;
+    they are rank-based, so use them to order one collection's hits, not to
+    compare relevance across collections
+    
+    Returns:
+        List of (doc_id, fused_score), best first
+    """
+    if not rankings:
+        return []
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    best_possible = len(rankings) / (k + 1)
+    return sorted(
+        ((doc_id, score / best_possible) for doc_id, score in fused.items()),
+        key=lambda item: item[1],
+        reverse=True
+    )
@@ -0,0 +1,136 @@
+"""
+Transaction Deduplication for repeated SMS imports
+Each parsed transaction gets a compact fingerprint; a per-user index of
+fingerprints drops transactions that were already imported
+"""
+
+import hashlib
+from threading import Lock
+from typing import Dict
+
+from app.services.cache import normalize_text
+
+
+def transaction_fingerprint(transaction: Dict) -> int:
+    """
+    64-bit identity of a parsed transaction
+
+    With a bank reference number (UTR / RRN / UPI Ref) the direction, amount
+    and reference identify it; the bank issues one reference per transfer,
+    while the date format and the merchant text differ between the alerts
+    that quote it, so adding them would only let repeats slip through. The
+    direction keeps a reversal credit quoting the original debit's reference
+    distinct. Otherwise the direction, amount, date, merchant and normalized
+    message text are used; a date the parser filled in with "today" is left
+    out, so the same undated SMS imported on different days still matches
+    """
+    paise = round(float(transaction["amount"]) * 100)
+    direction = transaction.get("type") or "debit"
+    reference = transaction.get("reference")
+    if reference:
+        key = f"ref|{direction}|{paise}|{reference.lower()}"
+    else:
+        date = "" if transaction.get("date_inferred") else (transaction.get("date") or "")
+        merchant = (transaction.get("merchant") or "").lower()
+        raw_sms = normalize_text(transaction.get("raw_sms") or "")
+        key = f"sms|{direction}|{paise}|{date}|{merchant}|{raw_sms}"
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class TransactionDeduper:
+    """
+    Exact set of fingerprints stored for one user
+
+    A plain set (rather than a Bloom filter) is used so a false positive can
+    never silently drop a real transaction; at 64 bits a collision needs
+    billions of transactions per user
+
+    Requests check transactions through a `DedupBatch`: fingerprints are held
+    as pending until the transactions are stored, then committed. A failed
+    request rolls them back, so retrying it imports the same transactions
+    """
+
+    def __init__(self):
+        self._seen = set()
+        # Fingerprints claimed by in-flight requests, not yet stored
+        self._pending = set()
+        self._lock = Lock()
+        self.duplicates = 0
+
+    def batch(self) -> "DedupBatch":
+        return DedupBatch(self)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class DedupBatch:
+    """
+    One request's view of a TransactionDeduper; use as a context manager
+
+        with deduper.batch() as pending:
+            fresh = [t for t in transactions if pending.add(t)]
+            store.append_many(fresh)
+            pending.commit()
+
+    Anything added but not committed is released on exit
+    """
+
+    def __init__(self, deduper: TransactionDeduper):
+        self.deduper = deduper
+        self._claimed = set()
+        self.duplicates = 0
+
+    def add(self, transaction: Dict) -> bool:
+        """Claim the transaction; False if it is stored or claimed already (a duplicate)"""
+        fingerprint = transaction_fingerprint(transaction)
+        deduper = self.deduper
+        with deduper._lock:
+            if fingerprint in deduper._seen or fingerprint in deduper._pending:
+                deduper.duplicates += 1
+                self.duplicates += 1
+                return False
+            deduper._pending.add(fingerprint)
+        self._claimed.add(fingerprint)
+        return True
+
+    def commit(self):
+        """Mark everything claimed so far as stored"""
+        deduper = self.deduper
+        with deduper._lock:
+            deduper._seen |= self._claimed
+            deduper._pending -= self._claimed
+        self._claimed = set()
+
+    def rollback(self):
+        """Release uncommitted claims (their transactions were not stored)"""
+        deduper = self.deduper
+        with deduper._lock:
+            deduper._pending -= self._claimed
+        self._claimed = set()
+
+    def __enter__(self) -> "DedupBatch":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.rollback()
+        return False
+
+
+class TransactionDeduperRegistry:
+    """One TransactionDeduper per user, created on first use"""
+
+    def __init__(self):
+        self._users: Dict[str, TransactionDeduper] = {}
+        self._lock = Lock()
+
+    def get(self, user_id: str) -> TransactionDeduper:
+        deduper = self._users.get(user_id)
+        if deduper is None:
+            with self._lock:
+                deduper = self._users.setdefault(user_id, TransactionDeduper())
+        return deduper
+
+
+# Singleton instance
+transaction_dedupers = TransactionDeduperRegistry()
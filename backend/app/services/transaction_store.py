@@ -0,0 +1,268 @@
+"""
+Columnar Transaction Store with vectorized analytics
+Parsed transactions are kept as compact NumPy columns per user, so dashboard
+aggregates are grouped reductions instead of a Python loop over dicts
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas import AnalyticsSummary
+
+EPOCH = date(1970, 1, 1)
+DEBIT, CREDIT = 0, 1
+INITIAL_CAPACITY = 1024
+
+
+@lru_cache(maxsize=8192)
+def parse_date_days(value: str) -> int:
+    """
+    Days since 1970-01-01 for the date formats SMSParser emits
+    (dd/mm/yyyy, dd-mm-yy, yyyy-mm-dd); unparseable dates count as today
+    """
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y"):
+        try:
+            return (datetime.strptime(value, fmt).date() - EPOCH).days
+        except (TypeError, ValueError):
+            continue
+    return (date.today() - EPOCH).days
+
+
+@lru_cache(maxsize=8192)
+def parse_date_month(value: str) -> int:
+    """Months since 1970-01 for the same date formats"""
+    day = days_to_date(parse_date_days(value))
+    return (day.year - EPOCH.year) * 12 + day.month - 1
+
+
+def month_label(month: int) -> str:
+    return f"{EPOCH.year + month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def days_to_date(days: int) -> date:
+    return date.fromordinal(EPOCH.toordinal() + int(days))
+
+
+class Vocabulary:
+    """Maps strings to dense small-int codes (and back)"""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class TransactionStore:
+    """
+    Append-only columns for one user's transactions
+    - amount: float64
+    - type: int8 (0 debit, 1 credit)
+    - category: int16 code, merchant: int32 code
+    - day: int32 days since epoch, month: int32 months since epoch
+    """
+
+    COLUMNS = {
+        "amount": np.float64,
+        "type": np.int8,
+        "category": np.int16,
+        "merchant": np.int32,
+        "day": np.int32,
+        "month": np.int32
+    }
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.size = 0
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self.categories = Vocabulary()
+        self.merchants = Vocabulary()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        capacity = len(self._columns["amount"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+
+    def append_many(self, transactions: Iterable[Dict]) -> int:
+        """
+        Append transactions shaped like SMSParser output
+        (amount, type, merchant, category, date); returns how many were added
+        """
+        amounts, types, categories, merchants, days, months = [], [], [], [], [], []
+        with self._lock:
+            for transaction in transactions:
+                amounts.append(float(transaction["amount"]))
+                types.append(CREDIT if transaction.get("type") == "credit" else DEBIT)
+                categories.append(self.categories.code(transaction.get("category") or "Others"))
+                merchants.append(self.merchants.code(transaction.get("merchant") or "Payment"))
+                days.append(parse_date_days(transaction.get("date") or ""))
+                months.append(parse_date_month(transaction.get("date") or ""))
+
+            count = len(amounts)
+            if count:
+                self._reserve(count)
+                end = self.size + count
+                self._columns["amount"][self.size:end] = amounts
+                self._columns["type"][self.size:end] = types
+                self._columns["category"][self.size:end] = categories
+                self._columns["merchant"][self.size:end] = merchants
+                self._columns["day"][self.size:end] = days
+                self._columns["month"][self.size:end] = months
+                self.size = end
+        return count
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Read-only views of the filled part of every column; appends never
+        write inside an existing view, so callers need no lock
+        """
+        size = self.size
+        views = {}
+        for name, column in self._columns.items():
+            view = column[:size]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def _window(self, start: Optional[date], end: Optional[date], *names: str) -> Dict[str, np.ndarray]:
+        """Columns `names` restricted to start <= date <= end (either bound optional)"""
+        columns = self.columns()
+        if start is None and end is None:
+            return {name: columns[name] for name in names}
+        mask = np.ones(len(columns["day"]), dtype=bool)
+        if start is not None:
+            mask &= columns["day"] >= (start - EPOCH).days
+        if end is not None:
+            mask &= columns["day"] <= (end - EPOCH).days
+        return {name: columns[name][mask] for name in names}
+
+    def _category_totals(self, totals: np.ndarray) -> Dict[str, float]:
+        return {
+            self.categories.values[code]: round(float(total), 2)
+            for code, total in enumerate(totals)
+            if total
+        }
+
+    def summary(self, start: Optional[date] = None, end: Optional[date] = None) -> AnalyticsSummary:
+        """
+        Income, expenses, balance and spending per category
+
+        Args:
+            start: First date included (optional)
+            end: Last date included (optional)
+
+        Returns:
+            AnalyticsSummary; `categories` holds debit totals per category
+        """
+        columns = self._window(start, end, "amount", "type", "category")
+        category_count = len(self.categories)
+
+        # (type, category) totals from a single weighted bincount
+        grid = np.bincount(
+            columns["type"].astype(np.int64) * category_count + columns["category"],
+            weights=columns["amount"],
+            minlength=2 * category_count
+        ).reshape(2, category_count)
+
+        income = float(grid[CREDIT].sum())
+        expenses = float(grid[DEBIT].sum())
+        return AnalyticsSummary(
+            income=round(income, 2),
+            expenses=round(expenses, 2),
+            balance=round(income - expenses, 2),
+            categories=self._category_totals(grid[DEBIT])
+        )
+
+    def monthly(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict]:
+        """
+        Per-month income, expenses, balance and category spending, oldest first
+        Months without transactions are omitted
+
+        Args:
+            start: First date included (optional)
+            end: Last date included (optional)
+
+        Returns:
+            List of dicts with month ("YYYY-MM"), income, expenses, balance, categories
+        """
+        columns = self._window(start, end, "amount", "type", "category", "month")
+        months = columns["month"]
+        if not len(months):
+            return []
+
+        first_month = int(months.min())
+        month_count = int(months.max()) - first_month + 1
+        category_count = len(self.categories)
+
+        # (month, type, category) totals from a single weighted bincount
+        keys = ((months.astype(np.int64) - first_month) * 2 + columns["type"]) * category_count + columns["category"]
+        grid = np.bincount(
+            keys, weights=columns["amount"], minlength=month_count * 2 * category_count
+        ).reshape(month_count, 2, category_count)
+        counts = np.bincount(months - first_month, minlength=month_count)
+
+        breakdown = []
+        for row in np.flatnonzero(counts):
+            income = float(grid[row, CREDIT].sum())
+            expenses = float(grid[row, DEBIT].sum())
+            breakdown.append({
+                "month": month_label(first_month + int(row)),
+                "income": round(income, 2),
+                "expenses": round(expenses, 2),
+                "balance": round(income - expenses, 2),
+                "categories": self._category_totals(grid[row, DEBIT])
+            })
+        return breakdown
+
+    def date_range(self) -> Optional[Tuple[date, date]]:
+        days = self.columns()["day"]
+        if not len(days):
+            return None
+        return days_to_date(days.min()), days_to_date(days.max())
+
+
+class TransactionStoreRegistry:
+    """One TransactionStore per user, created on first use"""
+
+    def __init__(self):
+        self._stores: Dict[str, TransactionStore] = {}
+        self._lock = Lock()
+
+    def get(self, user_id: str) -> TransactionStore:
+        store = self._stores.get(user_id)
+        if store is None:
+            with self._lock:
+                store = self._stores.setdefault(user_id, TransactionStore())
+        return store
+
+    def drop(self, user_id: str):
+        with self._lock:
+            self._stores.pop(user_id, None)
+
+
+# Singleton instance
+transaction_stores = TransactionStoreRegistry()
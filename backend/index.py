@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from mangum import Mangum
 import os
+from app.services.keyword_matcher import KeywordMatcher
 
 # Create FastAPI app directly
 app = FastAPI(title="ArthaGuide API", version="1.0.0", root_path="")
@@ -55,6 +56,8 @@ FEATURE_MAP = {
     }
 }
 
+keyword_matcher = KeywordMatcher({feature_id: info["keywords"] for feature_id, info in FEATURE_MAP.items()})
+
 @app.get("/api/intent/features")
 def get_features():
     return {"features": FEATURE_MAP}
@@ -62,13 +65,7 @@ def get_features():
 @app.post("/api/intent/classify")
 def classify_intent(intent_query: IntentQuery):
     """Simple keyword-based classification"""
-    query_lower = intent_query.query.lower()
-    
-    scores = {}
-    for feature_id, info in FEATURE_MAP.items():
-        score = sum(1 for keyword in info["keywords"] if keyword in query_lower)
-        if score > 0:
-            scores[feature_id] = score
+    scores = keyword_matcher.match(intent_query.query)
     
     if scores:
         best_match = max(scores.items(), key=lambda x: x[1])
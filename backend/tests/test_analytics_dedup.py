@@ -0,0 +1,74 @@
+"""
+Deduplication must not swallow transactions from a request that failed:
+retrying it has to import them
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import analytics
+from app.services.transaction_store import TransactionStore
+
+app = FastAPI()
+app.include_router(analytics.router, prefix="/api")
+client = TestClient(app, raise_server_exceptions=False)
+
+VALID = {
+    "amount": 250,
+    "type": "debit",
+    "merchant": "Swiggy",
+    "category": "Food",
+    "date": "12/03/2024",
+    "raw_sms": "Rs 250 paid to Swiggy on 12/03/2024"
+}
+
+
+def test_transactions_retry_after_invalid_batch():
+    response = client.post("/api/analytics/retry-tx/transactions", json={"transactions": [VALID, {"type": "debit"}]})
+    assert response.status_code == 400
+
+    response = client.post("/api/analytics/retry-tx/transactions", json={"transactions": [VALID]})
+    assert response.json() == {"added": 1, "duplicates": 0, "total": 1}
+
+    response = client.post("/api/analytics/retry-tx/transactions", json={"transactions": [VALID]})
+    assert response.json() == {"added": 0, "duplicates": 1, "total": 1}
+
+
+def test_sms_import_retry_after_failed_upload(monkeypatch):
+    export = "Rs 500 debited UPI Ref No 403212345678 on 12/03/2024\nINR 1,000 credited salary 01/03/2024"
+    append_many = TransactionStore.append_many
+
+    def failing_append_many(self, transactions):
+        raise RuntimeError("store unavailable")
+
+    monkeypatch.setattr(TransactionStore, "append_many", failing_append_many)
+    response = client.post("/api/analytics/retry-sms/sms", content=export)
+    assert response.status_code == 500
+
+    monkeypatch.setattr(TransactionStore, "append_many", append_many)
+    response = client.post("/api/analytics/retry-sms/sms", content=export)
+    assert response.json() == {"imported": 2, "duplicates": 0, "total": 2}
+
+    response = client.post("/api/analytics/retry-sms/sms", content=export)
+    assert response.json() == {"imported": 0, "duplicates": 2, "total": 2}
+
+
+def test_same_amount_rows_on_different_days_are_kept():
+    rides = [
+        {"amount": 100, "type": "debit", "merchant": "Uber", "category": "Transport", "date": f"2024-03-0{day}"}
+        for day in range(1, 6)
+    ]
+    response = client.post("/api/analytics/uber-rides/transactions", json={"transactions": rides})
+    assert response.json() == {"added": 5, "duplicates": 0, "total": 5}
+
+
+def test_reversal_quoting_the_debit_reference_is_kept():
+    export = (
+        "Rs 500 debited from A/c XX1234 on 12/03/2024 UPI Ref No 403212345678\n"
+        "Rs 500 credited to A/c XX1234 on 13/03/2024 reversal of UPI Ref No 403212345678"
+    )
+    response = client.post("/api/analytics/reversal/sms", content=export)
+    assert response.json() == {"imported": 2, "duplicates": 0, "total": 2}
+
+    summary = client.get("/api/analytics/reversal/summary").json()
+    assert summary["income"] == 500 and summary["expenses"] == 500
@@ -47,7 +47,7 @@ source venv/bin/activate
 
 # Install dependencies
 echo "📦 Installing Python dependencies..."
-pip install -q -r requirements.txt
+pip install -q -r requirements-rag.txt
 echo "✅ Dependencies installed"
 
 # Check if .env exists